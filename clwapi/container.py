@@ -1,8 +1,17 @@
+import ast
+import builtins
 import docker
+import hashlib
 import logging
+import os
+import shlex
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from pathlib import Path
 from fastapi import HTTPException
-from typing import Optional
+from typing import Callable, Dict, Optional, TypeVar
 
 from models import ShpblResponse, SANDBOX_CONTAINER
 
@@ -11,21 +20,294 @@ logger = logging.getLogger(__name__)
 # Docker client
 docker_client = docker.from_env()
 
+T = TypeVar("T")
+
+# Cached sandbox Container — looked up once instead of on every call
+_sandbox = None
+_sandbox_lock = threading.Lock()
+
 # Sandbox configuration
 SANDBOX_WORKDIR = "/workspace"
 ENV_FILE_PATH = "/sandbox-env/.env"
 
-# Maximum output size (characters)
+# Both clwapi and sandbox mount this volume
+ENV_FILE = Path(ENV_FILE_PATH)
+
+# Last parsed .env, keyed by the file's st_mtime_ns
+_ENV_CACHE: tuple[int, Dict[str, str]] | None = None
+
+# Serialises read-modify-write cycles on the .env file (see update_env)
+_env_lock = threading.Lock()
+
+# Exec output is redirected to files in this directory — a volume mounted
+# at the same path in both clwapi and the sandbox — so the Docker daemon
+# never has to buffer the streams.
+EXEC_LOG_DIR = "/var/log/clw"
+
+# Maximum output size (bytes)
 MAX_OUTPUT_LENGTH = 10_000
 
+# Results of side-effect-free /run-python snippets, keyed by a digest of
+# (workdir, code).  Agents often resend identical code on retries; the
+# cache is cleared whenever the managed .env changes.
+PYTHON_CACHE_SIZE = 256
+PYTHON_CACHE_TTL = 300  # seconds
+_python_cache: OrderedDict[bytes, tuple[float, ShpblResponse]] = OrderedDict()
+_python_cache_lock = threading.Lock()
+
+# The only builtins a cacheable snippet may reference.  Everything that can
+# reach the filesystem, the environment or interpreter state is left out.
+_PURE_BUILTINS = frozenset({
+    "abs", "all", "any", "ascii", "bin", "bool", "bytes", "chr", "complex",
+    "dict", "divmod", "enumerate", "filter", "float", "format",
+    "hex", "int", "isinstance", "len", "list", "map", "max", "min", "oct",
+    "ord", "pow", "print", "range", "repr", "reversed", "round",
+    "slice", "sorted", "str", "sum", "tuple", "zip",
+    "True", "False", "None", "Exception", "ValueError", "TypeError",
+    "KeyError", "IndexError", "ZeroDivisionError",
+})
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+def read_env() -> Dict[str, str]:
+    """Parse the .env file into a dict.  Ignores comments and blank lines.
+
+    The parse is cached until the file's mtime changes; callers get a copy
+    they are free to mutate.
+    """
+    global _ENV_CACHE
+    try:
+        mtime = ENV_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if _ENV_CACHE is not None and _ENV_CACHE[0] == mtime:
+        return dict(_ENV_CACHE[1])
+
+    env: Dict[str, str] = {}
+    for line in ENV_FILE.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        env[key.strip()] = value.strip()
+    _ENV_CACHE = (mtime, env)
+    return dict(env)
+
+
+def write_env(env: Dict[str, str]) -> None:
+    """Atomically write the env dict back to the file."""
+    global _ENV_CACHE
+    ENV_FILE.parent.mkdir(parents=True, exist_ok=True)
+    content = "\n".join(f"{k}={v}" for k, v in sorted(env.items())) + "\n"
+    # Write a sibling temp file and rename it over the original, so readers
+    # never see a half-written file.  No fsync: the dict is also held in
+    # _ENV_CACHE, and rename ordering is enough to never expose a torn file.
+    tmp = ENV_FILE.with_name(f"{ENV_FILE.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        tmp.write_text(content)
+        os.replace(tmp, ENV_FILE)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _ENV_CACHE = (ENV_FILE.stat().st_mtime_ns, dict(env))
+    # Cached /run-python results may have depended on the old values
+    with _python_cache_lock:
+        _python_cache.clear()
+
+
+def update_env(fn: Callable[[Dict[str, str]], bool]) -> Dict[str, str]:
+    """Apply ``fn`` to the current env under a lock and persist the result.
+
+    ``fn`` mutates the dict in place and returns whether anything changed;
+    the file is only rewritten when it did.  The env endpoints run in
+    FastAPI's threadpool, so without the lock two overlapping updates would
+    each write back their own stale copy and one would be lost.  Exceptions
+    raised by ``fn`` propagate with the file untouched.
+    """
+    with _env_lock:
+        env = read_env()
+        if fn(env):
+            write_env(env)
+        return env
+
+
+def get_sandbox():
+    """Return the sandbox Container, looking it up on first use only.
+
+    Raises:
+        docker.errors.NotFound: If the sandbox container does not exist
+    """
+    global _sandbox
+    if _sandbox is None:
+        with _sandbox_lock:
+            if _sandbox is None:
+                _sandbox = docker_client.containers.get(SANDBOX_CONTAINER)
+    return _sandbox
+
+
+def reset_sandbox() -> None:
+    """Drop the cached Container so the next get_sandbox() looks it up again."""
+    global _sandbox
+    _sandbox = None
+
+
+def with_sandbox(fn: Callable[..., T]) -> T:
+    """Call ``fn(container)``, retrying once with a fresh lookup if it's gone.
+
+    A NotFound from the cached Container may mean the sandbox was recreated
+    (new container id) — or just that ``fn`` asked for something missing,
+    such as a path passed to ``get_archive``.  ``reload()`` tells the two
+    apart: if the container still exists the NotFound is re-raised as is;
+    otherwise the cache is refreshed and ``fn`` re-run once.
+    """
+    container = get_sandbox()
+    try:
+        return fn(container)
+    except docker.errors.NotFound:
+        try:
+            container.reload()
+        except docker.errors.NotFound:
+            reset_sandbox()
+            return fn(get_sandbox())
+        raise
+
+
+def _is_cacheable(code: str) -> bool:
+    """True if ``code`` can only compute and print — no I/O, no imports.
+
+    Such a snippet can't observe anything outside the interpreter, so a
+    repeat can be answered without touching the sandbox.  Sets are
+    rejected too (literals, comprehensions, ``set``/``frozenset``): their
+    iteration order for str elements follows the per-process hash seed.
+    Default reprs that embed an object address (``<function f at 0x…>``)
+    can still differ from a fresh run.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+    for node in ast.walk(tree):
+        if isinstance(
+            node,
+            (ast.Import, ast.ImportFrom, ast.Global, ast.Nonlocal, ast.Set, ast.SetComp),
+        ):
+            return False
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            return False
+        if isinstance(node, ast.Name) and (
+            node.id.startswith("__")
+            or (node.id in _BUILTIN_NAMES and node.id not in _PURE_BUILTINS)
+        ):
+            return False
+    return True
+
+
+def _cached_python_result(key: bytes) -> ShpblResponse | None:
+    with _python_cache_lock:
+        entry = _python_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del _python_cache[key]
+            return None
+        _python_cache.move_to_end(key)
+        return response
+
+
+def _store_python_result(key: bytes, response: ShpblResponse) -> None:
+    with _python_cache_lock:
+        _python_cache[key] = (time.monotonic() + PYTHON_CACHE_TTL, response)
+        _python_cache.move_to_end(key)
+        while len(_python_cache) > PYTHON_CACHE_SIZE:
+            _python_cache.popitem(last=False)
+
+
+def _read_output(path: str) -> str:
+    """Read at most MAX_OUTPUT_LENGTH bytes of a captured stream, then delete it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return ""
+    try:
+        size = os.fstat(fd).st_size
+        data = os.pread(fd, MAX_OUTPUT_LENGTH, 0)
+    finally:
+        os.close(fd)
+        os.unlink(path)
+
+    output = data.decode("utf-8", errors="replace")
+    # Truncate output to prevent huge payloads
+    if size > MAX_OUTPUT_LENGTH:
+        output += "\n... [output truncated]"
+    return output
+
+
+def _script_tar(name: str, data: bytes) -> bytes:
+    """
+    Build a single-file tar archive for ``put_archive`` by hand.
+
+    A one-file archive is just a 512-byte ustar header, the payload padded
+    to a block boundary and two zero blocks, so there is no need for
+    ``tarfile``'s TarInfo/BytesIO machinery on every Python exec.
+    """
+    header = bytearray(512)
+    header[0:100] = name.encode("utf-8").ljust(100, b"\0")
+    header[100:108] = b"0000644\0"  # mode
+    header[108:116] = b"0000000\0"  # uid
+    header[116:124] = b"0000000\0"  # gid
+    header[124:136] = b"%011o\0" % len(data)  # size
+    header[136:148] = b"00000000000\0"  # mtime
+    header[148:156] = b" " * 8  # checksum placeholder (spaces)
+    header[156:157] = b"0"  # typeflag: regular file
+    header[257:265] = b"ustar\x0000"  # magic + version
+    header[148:156] = b"%06o\0 " % sum(header)
+    return bytes(header) + data + b"\0" * (-len(data) % 512 + 1024)
+
+
+def _run_captured(container, full_command: str, workdir: str) -> ShpblResponse:
+    """Run ``full_command`` with stdout/stderr redirected into EXEC_LOG_DIR."""
+    run_id = uuid.uuid4().hex
+    out_path = f"{EXEC_LOG_DIR}/{run_id}.out"
+    err_path = f"{EXEC_LOG_DIR}/{run_id}.err"
+
+    # `exec` with only redirections rebinds the shell's own fds, so every
+    # later step (including a failing `cd`) writes to the capture files.
+    try:
+        result = container.exec_run(
+            cmd=["sh", "-c", f"exec >{out_path} 2>{err_path}; {full_command}"],
+            workdir=workdir,
+            environment=read_env(),
+        )
+    except BaseException:
+        # _read_output won't run, so don't leave the files on the volume
+        for path in (out_path, err_path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        raise
+
+    return ShpblResponse(
+        success=result.exit_code == 0,
+        exit_code=result.exit_code,
+        stdout=_read_output(out_path),
+        stderr=_read_output(err_path),
+    )
+
 
 def exec_in_container(command: str, workdir: Optional[str] = None) -> ShpblResponse:
     """
     Execute command in the sandbox container.
 
-    Every command automatically sources /sandbox-env/.env so that
-    environment variables managed via the API are available to the
-    executed process without restarting the container.
+    The variables in /sandbox-env/.env are passed to every exec via the
+    Docker API's ``environment`` so that environment variables managed via
+    the API are available to the executed process without restarting the
+    container — no shell has to source the file.  Values are therefore
+    taken literally (no quote removal, ``$VAR`` expansion or ``export``
+    lines); see routers/env_service.py.
 
     Args:
         command: Shell command to execute
@@ -38,37 +320,14 @@ def exec_in_container(command: str, workdir: Optional[str] = None) -> ShpblRespo
         HTTPException: If container not found or execution fails
     """
     try:
-        container = docker_client.containers.get(SANDBOX_CONTAINER)
         workdir = workdir or SANDBOX_WORKDIR
 
-        # Source the managed .env file before running the user command.
-        # set -a exports every variable.  We must guard with -f because
-        # dash (Debian's /bin/sh) treats `. <missing-file>` as a fatal
-        # error that kills the shell — even with 2>/dev/null.
-        full_command = (
-            f"set -a; [ -f {ENV_FILE_PATH} ] && . {ENV_FILE_PATH}; set +a; "
-            f"cd {workdir} && {command}"
-        )
+        # Quote workdir so paths with spaces or shell metacharacters survive
+        full_command = f"cd {shlex.quote(workdir)} && {command}"
 
         logger.info(f"Executing in sandbox ({workdir}): {command}")
-        result = container.exec_run(
-            cmd=["sh", "-c", full_command], workdir=workdir, demux=True
-        )
-
-        stdout = result.output[0].decode() if result.output[0] else ""
-        stderr = result.output[1].decode() if result.output[1] else ""
-
-        # Truncate output to prevent huge payloads
-        if len(stdout) > MAX_OUTPUT_LENGTH:
-            stdout = stdout[:MAX_OUTPUT_LENGTH] + "\n... [output truncated]"
-        if len(stderr) > MAX_OUTPUT_LENGTH:
-            stderr = stderr[:MAX_OUTPUT_LENGTH] + "\n... [output truncated]"
-
-        return ShpblResponse(
-            success=result.exit_code == 0,
-            exit_code=result.exit_code,
-            stdout=stdout,
-            stderr=stderr,
+        return with_sandbox(
+            lambda container: _run_captured(container, full_command, workdir)
         )
     except docker.errors.NotFound:
         raise HTTPException(
@@ -90,59 +349,47 @@ def exec_python_in_container(
     put_archive), runs it with python3, then cleans up.  This avoids all
     shell-quoting / escaping issues with inline code strings.
 
-    The managed .env is sourced before execution, just like exec_in_container.
+    The managed .env variables are injected, just like exec_in_container.
+
+    Successful runs of side-effect-free snippets (see ``_is_cacheable``) are
+    cached for PYTHON_CACHE_TTL seconds and replayed for identical requests.
     """
     try:
-        container = docker_client.containers.get(SANDBOX_CONTAINER)
         workdir = workdir or SANDBOX_WORKDIR
 
+        cache_key = None
+        if _is_cacheable(code):
+            cache_key = hashlib.blake2b(
+                f"{workdir}\0{code}".encode("utf-8"), digest_size=16
+            ).digest()
+            cached = _cached_python_result(cache_key)
+            if cached is not None:
+                logger.info(f"Python script served from cache: {len(code)} chars")
+                return cached
+
         # Unique filename so concurrent calls never collide
         script_name = f"_llm_run_{uuid.uuid4().hex[:12]}.py"
         script_path = f"/tmp/{script_name}"
 
-        # Write the code to the temp file via a safe heredoc-style approach
-        # We use `cat` with stdin through docker exec to avoid any shell escaping
-        import tarfile
-        import io
+        script_bytes = code.encode("utf-8")
 
-        # Create an in-memory tar archive containing the script
-        tar_stream = io.BytesIO()
-        with tarfile.open(fileobj=tar_stream, mode="w") as tar:
-            script_bytes = code.encode("utf-8")
-            info = tarfile.TarInfo(name=script_name)
-            info.size = len(script_bytes)
-            tar.addfile(info, io.BytesIO(script_bytes))
-        tar_stream.seek(0)
-
-        # Put the script into /tmp in the container
-        container.put_archive("/tmp", tar_stream)
-
-        # Run it — source .env first, cd to workdir, then python3
+        # Run it — cd to workdir, then python3, then clean up
         full_command = (
-            f"set -a; . {ENV_FILE_PATH} 2>/dev/null; set +a; "
-            f"cd {workdir} && python3 {script_path}; "
+            f"cd {shlex.quote(workdir)} && python3 {script_path}; "
             f"_exit=$?; rm -f {script_path}; exit $_exit"
         )
 
-        logger.info(f"Executing Python script in sandbox ({workdir}): {len(code)} chars")
-        result = container.exec_run(
-            cmd=["sh", "-c", full_command], workdir=workdir, demux=True
-        )
+        def _upload_and_run(container) -> ShpblResponse:
+            # Put the script into /tmp in the container via put_archive — no
+            # shell is involved, so the code never needs escaping
+            container.put_archive("/tmp", _script_tar(script_name, script_bytes))
+            return _run_captured(container, full_command, workdir)
 
-        stdout = result.output[0].decode() if result.output[0] else ""
-        stderr = result.output[1].decode() if result.output[1] else ""
-
-        if len(stdout) > MAX_OUTPUT_LENGTH:
-            stdout = stdout[:MAX_OUTPUT_LENGTH] + "\n... [output truncated]"
-        if len(stderr) > MAX_OUTPUT_LENGTH:
-            stderr = stderr[:MAX_OUTPUT_LENGTH] + "\n... [output truncated]"
-
-        return ShpblResponse(
-            success=result.exit_code == 0,
-            exit_code=result.exit_code,
-            stdout=stdout,
-            stderr=stderr,
-        )
+        logger.info(f"Executing Python script in sandbox ({workdir}): {len(code)} chars")
+        response = with_sandbox(_upload_and_run)
+        if cache_key is not None and response.success:
+            _store_python_result(cache_key, response)
+        return response
     except docker.errors.NotFound:
         raise HTTPException(
             status_code=404,
@@ -1,9 +1,16 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 import logging
 import docker
 import time
 
-from container import exec_in_container, exec_python_in_container
+from container import (
+    exec_in_container,
+    exec_python_in_container,
+    get_sandbox,
+    with_sandbox,
+)
 from routers import db_service, env_service, file_service, skill_service
 from models import (
     ContainerLogsRequest,
@@ -13,7 +20,7 @@ from models import (
     SANDBOX_CONTAINER,
 )
 
-# Docker client for logs
+# Docker client for the health check (always wants a fresh status)
 docker_client = docker.from_env()
 
 # Configure logging
@@ -24,6 +31,17 @@ logger = logging.getLogger(__name__)
 SERVICE_VERSION = "1.0.0"
 SERVICE_START_TIME = time.time()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Prime the sandbox Container cache so the first exec skips the lookup
+    try:
+        get_sandbox()
+    except Exception as e:
+        logger.warning(f"Sandbox container not available at startup: {e}")
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="LLM Sandbox Gateway",
@@ -33,6 +51,10 @@ app = FastAPI(
         "Designed as a reliable interface for LLM agents."
     ),
     version=SERVICE_VERSION,
+    lifespan=lifespan,
+    # orjson encodes the large stdout/stderr/log strings several times
+    # faster than the stdlib json encoder
+    default_response_class=ORJSONResponse,
 )
 
 # Include routers
@@ -41,6 +63,10 @@ app.include_router(env_service.router)
 app.include_router(file_service.router)
 app.include_router(skill_service.router)
 
+# Handlers that touch Docker, the database or the filesystem are plain
+# ``def`` so FastAPI runs them in its threadpool — an ``async def`` calling
+# the blocking Docker SDK would stall the event loop for every request.
+
 
 @app.get("/")
 async def root():
@@ -53,7 +79,7 @@ async def root():
 
 
 @app.get("/health")
-async def health():
+def health():
     """Quick health check — also verifies the sandbox container is reachable."""
     try:
         container = docker_client.containers.get(SANDBOX_CONTAINER)
@@ -70,7 +96,7 @@ async def health():
 
 
 @app.post("/run-command", response_model=ShpblResponse)
-async def run_command(request: RunCommandRequest):
+def run_command(request: RunCommandRequest):
     """
     Execute a shell command inside the sandbox container.
 
@@ -87,7 +113,7 @@ async def run_command(request: RunCommandRequest):
 
 
 @app.post("/run-python", response_model=ShpblResponse)
-async def run_python(request: RunPythonRequest):
+def run_python(request: RunPythonRequest):
     """
     Execute a Python code string in the sandbox.
 
@@ -108,19 +134,28 @@ async def run_python(request: RunPythonRequest):
 
 
 @app.post("/terminal-logs", response_model=ShpblResponse)
-async def get_terminal_logs(request: ContainerLogsRequest):
+def get_terminal_logs(request: ContainerLogsRequest):
     """
     Retrieve recent logs from the sandbox container.
     """
     try:
-        container = docker_client.containers.get(request.container_name)
-        logs = container.logs(tail=request.num_lines).decode("utf-8")
-
-        # Prune to last 5K characters
+        # Keep only the last 5K bytes while streaming so the full tail is
+        # never materialised.  stream=True implies follow=True in docker-py,
+        # so follow must be switched off explicitly.
         max_chars = 5000
-        pruned = len(logs) > max_chars
-        if pruned:
-            logs = logs[-max_chars:]
+        pruned = False
+        buf = bytearray()
+        log_stream = with_sandbox(
+            lambda container: container.logs(
+                tail=request.num_lines, stream=True, follow=False
+            )
+        )
+        for chunk in log_stream:
+            buf += chunk
+            if len(buf) > max_chars:
+                del buf[:-max_chars]
+                pruned = True
+        logs = buf.decode("utf-8", errors="replace")
 
         return ShpblResponse(
             success=True,
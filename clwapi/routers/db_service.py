@@ -58,7 +58,7 @@ def get_db_connection():
 
 
 @router.get("/schemas", response_model=ShpblResponse)
-async def get_schemas():
+def get_schemas():
     """
     Get all database schemas
 
@@ -90,7 +90,7 @@ async def get_schemas():
 
 
 @router.get("/tables", response_model=ShpblResponse)
-async def get_tables(schema_name: str = Query(..., description="Schema name to query")):
+def get_tables(schema_name: str = Query(..., description="Schema name to query")):
     """
     Get all tables in a specific schema with row counts
 
@@ -149,7 +149,7 @@ async def get_tables(schema_name: str = Query(..., description="Schema name to q
 
 
 @router.get("/table-data", response_model=ShpblResponse)
-async def get_table_data(
+def get_table_data(
     schema_name: str = Query(..., description="Schema name"),
     table_name: str = Query(..., description="Table name"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum rows to return"),
@@ -245,7 +245,7 @@ async def get_table_data(
 
 
 @router.post("/execute", response_model=ShpblResponse)
-async def execute_sql(request: ExecuteSQLRequest):
+def execute_sql(request: ExecuteSQLRequest):
     """
     Execute an arbitrary SQL statement against the workspace PostgreSQL database.
 
@@ -2,31 +2,64 @@
 
 import io
 import os
+import posixpath
 import tarfile
 import logging
 from pathlib import PurePosixPath
+from typing import Any
 
 import docker
 from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import StreamingResponse
 
-from models import ShpblResponse, SANDBOX_CONTAINER
-from container import exec_in_container
+from models import ShpblResponse
+from container import exec_in_container, with_sandbox
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/files", tags=["files"])
 
-docker_client = docker.from_env()
-
 # Root directory that users are allowed to browse
 ALLOWED_ROOT = "/workspace"
 
+# Chunk size used when streaming downloads back to the client
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkReader(io.RawIOBase):
+    """Expose the ``get_archive`` chunk iterator as a readable file object."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def _within_root(path: str, root: str) -> bool:
+    return path == root or path.startswith(root + "/")
+
 
 def _validate_path(path: str) -> str:
-    """Ensure the requested path is within /workspace (no traversal)."""
-    resolved = str(PurePosixPath(path))
-    if not resolved.startswith(ALLOWED_ROOT):
+    """Ensure the requested path is within /workspace (no traversal).
+
+    ``normpath`` collapses ``..`` first, so ``/workspace/../etc`` is rejected,
+    and the root must match a whole component (``/workspacefoo`` is not in).
+    """
+    resolved = posixpath.normpath(path)
+    if not _within_root(resolved, ALLOWED_ROOT):
         raise HTTPException(
             status_code=400,
             detail=f"Path must be within {ALLOWED_ROOT}",
@@ -39,30 +72,33 @@ def _parse_tree(raw_output: str, root: str) -> list[dict]:
     Parse the output of ``find -printf '%y %p\\n'`` into a nested tree.
 
     Each entry is ``<type_char> <path>`` where type_char is ``f`` (file) or
-    ``d`` (directory).
+    ``d`` (directory).  ``find`` lists a directory before its contents, so
+    every node is attached to its parent as soon as it is created.
     """
     nodes: dict[str, dict] = {}
-    lines = [l for l in raw_output.strip().splitlines() if l.strip()]
 
-    for line in lines:
+    for line in raw_output.strip().splitlines():
+        if not line.strip():
+            continue
         parts = line.split(" ", 1)
         if len(parts) != 2:
             continue
         type_char, abs_path = parts
         entry_type = "directory" if type_char == "d" else "file"
         name = os.path.basename(abs_path) or abs_path
-        nodes[abs_path] = {
+        node: dict[str, Any] = {
             "name": name,
             "path": abs_path,
             "type": entry_type,
             "children": [] if entry_type == "directory" else None,
         }
+        nodes[abs_path] = node
 
-    # Build hierarchy
-    for abs_path, node in nodes.items():
         parent_path = str(PurePosixPath(abs_path).parent)
-        if parent_path in nodes and parent_path != abs_path:
-            nodes[parent_path]["children"].append(node)
+        if parent_path != abs_path:
+            parent = nodes.get(parent_path)
+            if parent is not None:
+                parent["children"].append(node)
 
     # Return children of the requested root (or the root node itself)
     if root in nodes:
@@ -70,8 +106,42 @@ def _parse_tree(raw_output: str, root: str) -> list[dict]:
     return list(nodes.values())
 
 
+def _scan_tree(root: str, depth: int) -> list[dict]:
+    """
+    Build the nested tree under ``root`` with ``os.scandir``, in one pass.
+
+    Mirrors ``find -maxdepth <depth> -not -path '*/.*'``: hidden entries
+    are skipped (and not descended into) and symlinks are not followed.
+    """
+    tree: list[dict[str, Any]] = []
+    stack: list[tuple[str, list[dict[str, Any]], int]] = [(root, tree, 1)]
+    while stack:
+        dir_path, children, level = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            if dir_path == root:
+                raise
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            is_dir = entry.is_dir(follow_symlinks=False)
+            node: dict[str, Any] = {
+                "name": entry.name,
+                "path": entry.path,
+                "type": "directory" if is_dir else "file",
+                "children": [] if is_dir else None,
+            }
+            children.append(node)
+            if is_dir and level < depth:
+                stack.append((entry.path, node["children"], level + 1))
+    return tree
+
+
 @router.get("/tree", response_model=ShpblResponse)
-async def get_file_tree(
+def get_file_tree(
     path: str = Query(ALLOWED_ROOT, description="Directory path to list"),
     depth: int = Query(5, ge=1, le=10, description="Max depth to recurse"),
 ):
@@ -82,6 +152,31 @@ async def get_file_tree(
     """
     safe_path = _validate_path(path)
 
+    # Fast path: the workspace volume is mounted into clwapi too, so walk it
+    # directly instead of round-tripping a `find` through docker exec.
+    if os.path.isdir(ALLOWED_ROOT):
+        # The walk runs on clwapi's own filesystem, so a symlink inside the
+        # workspace must not lead it anywhere else
+        if not _within_root(os.path.realpath(safe_path), os.path.realpath(ALLOWED_ROOT)):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Path must be within {ALLOWED_ROOT}",
+            )
+        try:
+            tree = [] if os.path.isfile(safe_path) else _scan_tree(safe_path, depth)
+        except OSError as e:
+            logger.error("scandir failed for %s: %s", safe_path, e)
+            return ShpblResponse(
+                success=False,
+                message=f"Failed to list {safe_path}: {e.strerror or e}",
+                data={"path": safe_path, "tree": []},
+            )
+        return ShpblResponse(
+            success=True,
+            message=f"File tree for {safe_path}",
+            data={"path": safe_path, "tree": tree},
+        )
+
     result = exec_in_container(
         command=f'find "{safe_path}" -maxdepth {depth} -not -path "*/\\.*" -printf "%y %p\\n"',
     )
@@ -104,57 +199,64 @@ async def get_file_tree(
 
 
 @router.get("/download")
-async def download_file(
+def download_file(
     path: str = Query(..., description="Absolute path of the file to download"),
 ):
     """
     Download a single file from the sandbox container.
 
     Uses Docker ``get_archive`` to pull the file as a tar stream, then
-    extracts and returns the raw bytes with an appropriate Content-Disposition.
+    streams the extracted bytes back with an appropriate Content-Disposition.
     """
     safe_path = _validate_path(path)
 
     try:
-        container = docker_client.containers.get(SANDBOX_CONTAINER)
-    except docker.errors.NotFound:
-        raise HTTPException(status_code=404, detail="Sandbox container not found")
-
-    try:
-        bits, stat = container.get_archive(safe_path)
+        bits, stat = with_sandbox(lambda container: container.get_archive(safe_path))
     except docker.errors.NotFound:
         raise HTTPException(status_code=404, detail=f"File not found: {safe_path}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    # get_archive returns a tar stream — extract the single file
-    tar_bytes = b"".join(bits)
-    tar_stream = io.BytesIO(tar_bytes)
-
+    # get_archive returns a tar stream — read it in streaming mode ("r|")
+    # so neither the archive nor the file is ever held in memory whole.
+    tar = None
     try:
-        with tarfile.open(fileobj=tar_stream) as tar:
-            members = tar.getmembers()
-            if not members:
-                raise HTTPException(status_code=404, detail="Archive is empty")
-            member = members[0]
-            if member.isdir():
-                raise HTTPException(
-                    status_code=400,
-                    detail="Path is a directory. Use /files/tree to browse.",
-                )
-            extracted = tar.extractfile(member)
-            if extracted is None:
-                raise HTTPException(
-                    status_code=500, detail="Could not extract file from archive"
-                )
-            file_bytes = extracted.read()
+        tar = tarfile.open(fileobj=_ChunkReader(bits), mode="r|")
+        member = tar.next()
+        if member is None:
+            raise HTTPException(status_code=404, detail="Archive is empty")
+        if member.isdir():
+            raise HTTPException(
+                status_code=400,
+                detail="Path is a directory. Use /files/tree to browse.",
+            )
+        extracted = tar.extractfile(member)
+        if extracted is None:
+            raise HTTPException(
+                status_code=500, detail="Could not extract file from archive"
+            )
     except tarfile.TarError as e:
+        if tar is not None:
+            tar.close()
         raise HTTPException(status_code=500, detail=f"Tar extraction error: {e}")
+    except HTTPException:
+        if tar is not None:
+            tar.close()
+        raise
+
+    def _iter_file():
+        try:
+            while chunk := extracted.read(DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+        except tarfile.TarError as e:
+            logger.error("Tar extraction error while streaming %s: %s", safe_path, e)
+        finally:
+            tar.close()
 
     filename = os.path.basename(safe_path)
 
     return StreamingResponse(
-        io.BytesIO(file_bytes),
+        _iter_file(),
         media_type="application/octet-stream",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -1,12 +1,21 @@
 """Skill discovery endpoints – list and read skill definitions from /skills."""
 
 import os
+import mmap
+import stat
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import yaml
 from fastapi import APIRouter, HTTPException
 
+# libyaml's C loader is ~10x faster; fall back if PyYAML was built without it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 from models import ShpblResponse
 
 logger = logging.getLogger(__name__)
@@ -16,44 +25,161 @@ router = APIRouter(prefix="/skills", tags=["skills"])
 # Skills root – mounted read-only from the host
 SKILLS_ROOT = Path("/skills")
 
-
-def _parse_frontmatter(text: str) -> dict:
-    """Extract YAML frontmatter delimited by ``---`` from a Markdown file."""
-    stripped = text.lstrip()
-    if not stripped.startswith("---"):
-        return {}
-    # Find closing ---
-    end = stripped.find("---", 3)
-    if end == -1:
-        return {}
-    yaml_block = stripped[3:end]
+# Summaries keyed by SKILL.md path → (st_mtime_ns, summary)
+_SKILLS_CACHE: dict[str, tuple[int, dict]] = {}
+
+# Sorted skill sub-directories, keyed by SKILLS_ROOT's st_mtime_ns
+_SKILL_DIRS_CACHE: tuple[int, list[Path]] | None = None
+
+# Shared pool for SKILL.md reads — file I/O and libyaml parsing both
+# release the GIL, so summaries of independent skills load concurrently
+_SUMMARY_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="skills")
+
+# Directories to skip when listing companion files
+_SKIP_DIRS = frozenset({
+    # Python
+    "__pycache__", ".venv", "venv", "env", ".env", ".eggs",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".nox",
+    # Node / JS
+    "node_modules", ".next", ".nuxt", "dist", "build",
+    # Version control
+    ".git", ".hg", ".svn",
+    # IDE / editor
+    ".vscode", ".idea", ".vs",
+    # Project-specific
+    "__scratchpad",
+    # Misc caches & output
+    ".cache", ".coverage", "htmlcov", ".hypothesis",
+})
+
+# Directory-name suffixes to skip (a set lookup can't match patterns)
+_SKIP_DIR_SUFFIXES = (".egg-info",)
+
+# File extensions to skip (dotfiles such as .DS_Store are skipped separately)
+_SKIP_EXTS = (
+    ".pyc", ".pyo", ".pyd",       # Python bytecode
+    ".so", ".dylib", ".dll",       # native extensions
+    ".egg", ".whl",                # packaged distributions
+)
+
+
+def _parse_yaml_block(yaml_block: str) -> dict:
+    """Parse the YAML between the ``---`` delimiters of a SKILL.md."""
     try:
-        return yaml.safe_load(yaml_block) or {}
+        return yaml.load(yaml_block, Loader=_YamlLoader) or {}
     except yaml.YAMLError as exc:
         logger.warning("Failed to parse SKILL.md frontmatter: %s", exc)
         return {}
 
 
+def _read_frontmatter(skill_md: Path) -> dict:
+    """Extract YAML frontmatter delimited by ``---`` from a Markdown file.
+
+    The file is mmapped and only the frontmatter slice is decoded, so the
+    (usually much longer) Markdown body is never copied or decoded.
+    """
+    with open(skill_md, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file — nothing to map
+            return {}
+    with mm:
+        start = 0
+        size = len(mm)
+        while start < size and mm[start : start + 1].isspace():
+            start += 1
+        if mm[start : start + 3] != b"---":
+            return {}
+        # Find closing ---
+        end = mm.find(b"---", start + 3)
+        if end == -1:
+            return {}
+        yaml_block = mm[start + 3 : end].decode("utf-8", errors="replace")
+    return _parse_yaml_block(yaml_block)
+
+
 def _skill_summary(skill_dir: Path) -> dict | None:
-    """Return a compact summary dict for a single skill directory."""
+    """Return a compact summary dict for a single skill directory.
+
+    Summaries are cached until the SKILL.md mtime changes.
+    """
     skill_md = skill_dir / "SKILL.md"
-    if not skill_md.is_file():
+    try:
+        st = skill_md.stat()
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
         return None
 
-    content = skill_md.read_text(encoding="utf-8", errors="replace")
-    fm = _parse_frontmatter(content)
+    key = str(skill_md)
+    cached = _SKILLS_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns:
+        return cached[1]
+
+    fm = _read_frontmatter(skill_md)
 
-    return {
+    summary = {
         "name": fm.get("name", skill_dir.name),
         "description": fm.get("description", "").strip(),
         "compatibility": fm.get("compatibility", ""),
         "allowed_tools": fm.get("allowed-tools", ""),
         "metadata": fm.get("metadata", {}),
     }
+    _SKILLS_CACHE[key] = (st.st_mtime_ns, summary)
+    return summary
+
+
+def _skill_dirs() -> list[Path]:
+    """Return the sorted sub-directories of SKILLS_ROOT.
+
+    The listing is cached until the root directory's mtime changes, which
+    happens whenever an entry is added, removed or renamed.
+    """
+    global _SKILL_DIRS_CACHE
+    mtime = SKILLS_ROOT.stat().st_mtime_ns
+    if _SKILL_DIRS_CACHE is not None and _SKILL_DIRS_CACHE[0] == mtime:
+        return _SKILL_DIRS_CACHE[1]
+    dirs = sorted(entry for entry in SKILLS_ROOT.iterdir() if entry.is_dir())
+    _SKILL_DIRS_CACHE = (mtime, dirs)
+    return dirs
+
+
+def _companion_files(skill_dir: Path) -> list[str]:
+    """Return the sorted relative paths of files bundled with a skill.
+
+    Walks with ``os.scandir`` and an explicit stack; the ``DirEntry`` type
+    info comes from the directory listing itself, so ordinary entries cost
+    no extra ``stat``.  Like the ``os.walk`` file list it replaces,
+    symlinked directories are skipped: neither listed nor descended into.
+    """
+    files: list[str] = []
+    stack = [("", str(skill_dir))]
+    while stack:
+        rel_dir, abs_dir = stack.pop()
+        try:
+            it = os.scandir(abs_dir)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir():
+                    if (
+                        not entry.is_symlink()
+                        and name not in _SKIP_DIRS
+                        and not name.endswith(_SKIP_DIR_SUFFIXES)
+                    ):
+                        stack.append((f"{rel_dir}{name}/", entry.path))
+                elif not name.startswith(".") and not name.endswith(_SKIP_EXTS):
+                    files.append(f"{rel_dir}{name}")
+    if "SKILL.md" in files:
+        files.remove("SKILL.md")
+    files.sort()
+    return files
 
 
 @router.get("/list", response_model=ShpblResponse)
-async def list_skills():
+def list_skills():
     """Return a list of all available skills with name and description."""
     if not SKILLS_ROOT.is_dir():
         return ShpblResponse(
@@ -62,13 +188,8 @@ async def list_skills():
             data={"skills": []},
         )
 
-    skills: list[dict] = []
-    for entry in sorted(SKILLS_ROOT.iterdir()):
-        if not entry.is_dir():
-            continue
-        summary = _skill_summary(entry)
-        if summary is not None:
-            skills.append(summary)
+    summaries = _SUMMARY_POOL.map(_skill_summary, _skill_dirs())
+    skills = [summary for summary in summaries if summary is not None]
 
     return ShpblResponse(
         success=True,
@@ -78,7 +199,7 @@ async def list_skills():
 
 
 @router.get("/read/{skill_name}", response_model=ShpblResponse)
-async def read_skill(skill_name: str):
+def read_skill(skill_name: str):
     """Return the full SKILL.md content for a given skill."""
     skill_dir = SKILLS_ROOT / skill_name
     if not skill_dir.is_dir():
@@ -93,41 +214,8 @@ async def read_skill(skill_name: str):
 
     content = skill_md.read_text(encoding="utf-8", errors="replace")
 
-    # Directories to skip when listing companion files
-    _SKIP_DIRS = {
-        # Python
-        "__pycache__", ".venv", "venv", "env", ".env", ".eggs", "*.egg-info",
-        ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".nox",
-        # Node / JS
-        "node_modules", ".next", ".nuxt", "dist", "build",
-        # Version control
-        ".git", ".hg", ".svn",
-        # IDE / editor
-        ".vscode", ".idea", ".vs",
-        # Project-specific
-        "__scratchpad",
-        # Misc caches & output
-        ".cache", ".coverage", "htmlcov", ".hypothesis",
-    }
-
-    # File extensions to skip
-    _SKIP_EXTS = (
-        ".pyc", ".pyo", ".pyd",       # Python bytecode
-        ".so", ".dylib", ".dll",       # native extensions
-        ".egg", ".whl",                # packaged distributions
-        ".DS_Store",                   # macOS
-    )
-
     # Also list companion files (scripts, etc.)
-    files: list[str] = []
-    for root, dirs, filenames in os.walk(skill_dir):
-        dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
-        for fname in filenames:
-            if fname.endswith(_SKIP_EXTS) or fname.startswith("."):
-                continue
-            rel = os.path.relpath(os.path.join(root, fname), skill_dir)
-            if rel != "SKILL.md":
-                files.append(rel)
+    files = _companion_files(skill_dir)
 
     return ShpblResponse(
         success=True,
@@ -135,6 +223,6 @@ async def read_skill(skill_name: str):
         data={
             "name": skill_name,
             "content": content,
-            "files": sorted(files),
+            "files": files,
         },
     )
@@ -1,14 +1,35 @@
 """Shared fixtures for the skill testing framework."""
 
 import sys
+import json
 import importlib
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
-import yaml
 
-from tests.helpers import SKILLS_ROOT, discover_skill_dirs, parse_frontmatter
+from tests.helpers import (
+    SKILLS_ROOT,
+    StubConnection,
+    StubCursor,
+    discover_skill_dirs,
+    parse_frontmatter,
+)
+
+
+# ---------------------------------------------------------------------------
+# Command-line options
+# ---------------------------------------------------------------------------
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--skills",
+        default=None,
+        metavar="PATTERN",
+        help="only run per-skill tests for skills whose directory name "
+        "matches this fnmatch pattern, e.g. --skills=db-operations",
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -16,6 +37,19 @@ from tests.helpers import SKILLS_ROOT, discover_skill_dirs, parse_frontmatter
 # ---------------------------------------------------------------------------
 
 
+def _dump_frontmatter(fm: dict) -> str:
+    """Serialise frontmatter, skipping the YAML emitter for flat mappings.
+
+    JSON scalars are valid YAML, so flat str/int/bool/None values are
+    written directly; anything nested still goes through ``yaml.dump``.
+    """
+    if all(v is None or isinstance(v, (str, int, bool)) for v in fm.values()):
+        return "".join(f"{k}: {json.dumps(v)}\n" for k, v in fm.items())
+    import yaml
+
+    return yaml.dump(fm, default_flow_style=False)
+
+
 @pytest.fixture
 def skills_root():
     """Path to the project's skills/ directory."""
@@ -33,7 +67,7 @@ def fake_skill(tmp_path):
         skill_dir = tmp_path / name
         skill_dir.mkdir()
         fm = frontmatter or {"name": name, "description": f"Test skill {name}"}
-        content = "---\n" + yaml.dump(fm, default_flow_style=False) + "---\n" + body
+        content = "---\n" + _dump_frontmatter(fm) + "---\n" + body
         (skill_dir / "SKILL.md").write_text(content)
         return skill_dir
 
@@ -45,93 +79,30 @@ def fake_skill(tmp_path):
 # ---------------------------------------------------------------------------
 
 
-class MockCursor:
-    """A configurable mock cursor that behaves like psycopg2 RealDictCursor.
-
-    Set ``results`` to a list-of-lists.  Each ``execute()`` call pops from
-    the front so sequential queries get different return values.
-    """
-
-    def __init__(self, results: list[list[dict]] | None = None, description=True):
-        self._results_queue: list[list[dict]] = list(results or [])
-        self._current: list[dict] = []
-        self.description = description  # None => write statement
-        self.rowcount = 0
-
-    def execute(self, sql, params=None):
-        if self._results_queue:
-            self._current = self._results_queue.pop(0)
-        else:
-            self._current = []
-        self.rowcount = len(self._current)
-
-    def fetchall(self):
-        return self._current
-
-    def fetchone(self):
-        return self._current[0] if self._current else None
-
-    def fetchmany(self, size=None):
-        if size is None:
-            return self._current
-        return self._current[:size]
-
-    def close(self):
-        pass
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *a):
-        pass
-
-
-class MockConnection:
-    """A mock psycopg2 connection that returns a pre-configured MockCursor."""
-
-    def __init__(self, cursor: MockCursor):
-        self._cursor = cursor
-        self.autocommit = False
-
-    def cursor(self, **kwargs):
-        return self._cursor
-
-    def commit(self):
-        pass
-
-    def rollback(self):
-        pass
-
-    def close(self):
-        pass
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *a):
-        pass
-
-
 @pytest.fixture
 def mock_db():
     """Factory fixture: create a mock psycopg2.connect that returns
-    a MockConnection with pre-loaded query results.
+    a StubConnection with pre-loaded query results.
 
     Usage:
         conn, cur = mock_db([
             [{"schema_name": "public"}],       # result for 1st execute()
             [{"table_name": "users"}],          # result for 2nd execute()
         ])
-    Returns (MockConnection, MockCursor) so tests can inspect state.
+    Returns (StubConnection, StubCursor) so tests can inspect state.
     """
     def _factory(results: list[list[dict]], description=True):
-        cur = MockCursor(results=results, description=description)
-        conn = MockConnection(cursor=cur)
+        cur = StubCursor(results=results, description=description)
+        conn = StubConnection(cursor=cur)
         return conn, cur
 
     return _factory
 
 
+# Script directories import_script has already put on sys.path
+_added_paths: set[str] = set()
+
+
 def import_script(script_path: Path):
     """Import a script's module by file path so we can call main().
 
@@ -144,8 +115,12 @@ def import_script(script_path: Path):
     # Avoid import conflicts by making the module name unique
     unique_name = f"_skill_script_{script_path.parent.parent.name}_{module_name}"
 
-    if parent not in sys.path:
-        sys.path.insert(0, parent)
+    # The set only short-circuits repeat calls; on a miss, sys.path itself
+    # is checked, since anything else may have added the directory since
+    if parent not in _added_paths:
+        if parent not in sys.path:
+            sys.path.insert(0, parent)
+        _added_paths.add(parent)
 
     spec = importlib.util.spec_from_file_location(unique_name, script_path)
     mod = importlib.util.module_from_spec(spec)
@@ -1,27 +1,178 @@
 """Shared helpers for skill tests — importable by test modules."""
 
+import csv
+import fnmatch
+import functools
+import hashlib
+import io
+import os
 import re
+from collections import deque
 from pathlib import Path
-
-import yaml
+from typing import NamedTuple
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 REPO_ROOT = PROJECT_ROOT.parent
 SKILLS_ROOT = REPO_ROOT / "sandbox" / "skills"
 
+# Frontmatter must open with ``---`` (after optional leading whitespace)
+_FM_OPEN = re.compile(r"\s*---")
 
-def discover_skill_dirs() -> list[Path]:
-    """Return all skill directories (dirs that contain SKILL.md)."""
-    if not SKILLS_ROOT.is_dir():
-        return []
-    return sorted(
-        d for d in SKILLS_ROOT.iterdir()
-        if d.is_dir() and (d / "SKILL.md").is_file()
-    )
+# One ``key: value`` line of a flat YAML mapping
+_FLAT_LINE = re.compile(r"^([A-Za-z_][\w-]*)\s*:(?:\s+(.*?))?\s*$")
 
+# Plain scalars that YAML resolves to something other than a string (or
+# that need its full grammar) — any of these sends the block to PyYAML
+_YAML_SPECIAL = re.compile(
+    r"""^(?:[-?:,\[\]{}#&*!|>'"%@`.0-9+]"""
+    r"|(?:y|Y|yes|Yes|YES|n|N|no|No|NO|on|On|ON|off|Off|OFF)$)"
+    r"|: | #|:$"
+)
+_INT = re.compile(r"^[-+]?(?:0|[1-9][0-9]*)$")
+_BOOLS = {"true": True, "True": True, "TRUE": True,
+          "false": False, "False": False, "FALSE": False}
+_NULLS = frozenset({"", "~", "null", "Null", "NULL"})
 
-def parse_frontmatter(text: str) -> dict:
-    """Extract YAML frontmatter delimited by ``---`` from a Markdown file."""
+# Parsed frontmatter keyed by blake2b digest of the Markdown text
+_TEXT_CACHE: dict[bytes, dict] = {}
+
+
+def _scan_dir(path: Path) -> tuple[frozenset[str], frozenset[str]]:
+    """Return ``(file_names, dir_names)`` for one directory listing.
+
+    The types come from the ``DirEntry`` objects ``os.scandir`` yields, so
+    only symlinks cost an extra ``stat``.
+    """
+    files, dirs = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file():
+                files.append(entry.name)
+            elif entry.is_dir():
+                dirs.append(entry.name)
+    return frozenset(files), frozenset(dirs)
+
+
+@functools.lru_cache(maxsize=1)
+def _scan_skills() -> tuple[tuple[Path, frozenset[str], frozenset[str]], ...]:
+    """``(skill_dir, file_names, dir_names)`` for each dir with a SKILL.md."""
+    try:
+        _, names = _scan_dir(SKILLS_ROOT)
+    except (FileNotFoundError, NotADirectoryError):
+        return ()
+    skills = []
+    for name in sorted(names):
+        skill_dir = SKILLS_ROOT / name
+        files, dirs = _scan_dir(skill_dir)
+        if "SKILL.md" in files:
+            skills.append((skill_dir, files, dirs))
+    return tuple(skills)
+
+
+def discover_skill_dirs() -> tuple[Path, ...]:
+    """Return all skill directories (dirs that contain SKILL.md).
+
+    The skills tree doesn't change during a test session, so the scan runs
+    once and every caller shares the result.
+    """
+    return tuple(skill_dir for skill_dir, _, _ in _scan_skills())
+
+
+class SkillBundle(NamedTuple):
+    """Everything the validation tests need about one skill, resolved once."""
+
+    name: str
+    path: Path
+    has_skill_md: bool
+    skill_md_path: Path
+    frontmatter: dict
+    script_refs: frozenset[str]  # scripts/ files SKILL.md mentions
+    scripts_dir: Path | None  # None when the skill has no scripts/ directory
+    script_names: frozenset[str]  # names of the regular files in scripts/
+    script_paths: tuple[Path, ...]  # the same files as paths, sorted
+
+
+def _load_skill_md(path: Path) -> tuple[dict, frozenset[str]]:
+    """Return ``(frontmatter, script_refs)`` for a SKILL.md, from one read."""
+    text = path.read_text()
+    return parse_frontmatter(text), frozenset(_find_script_refs(text))
+
+
+@functools.lru_cache(maxsize=4)
+def discover_skill_bundles(pattern: str | None = None) -> tuple[SkillBundle, ...]:
+    """Return a :class:`SkillBundle` for every discovered skill directory.
+
+    SKILL.md is read and parsed, and scripts/ listed, once per session —
+    one ``scandir`` per skill and one per scripts/ — so the parametrised
+    tests never touch the filesystem for that state again.  With
+    ``pattern``, only skills whose directory name matches it (``fnmatch``)
+    are loaded at all.
+    """
+    bundles = []
+    for skill_dir, files, dirs in _scan_skills():
+        if pattern is not None and not fnmatch.fnmatch(skill_dir.name, pattern):
+            continue
+        skill_md = skill_dir / "SKILL.md"
+        fm, refs = _load_skill_md(skill_md)
+        scripts_dir: Path | None = None
+        scripts: frozenset[str] = frozenset()
+        script_paths: tuple[Path, ...] = ()
+        if "scripts" in dirs:
+            scripts_dir = skill_dir / "scripts"
+            scripts, _ = _scan_dir(scripts_dir)
+            script_paths = tuple(scripts_dir / n for n in sorted(scripts))
+        bundles.append(SkillBundle(
+            name=skill_dir.name,
+            path=skill_dir,
+            has_skill_md="SKILL.md" in files,
+            skill_md_path=skill_md,
+            frontmatter=fm,
+            script_refs=refs,
+            scripts_dir=scripts_dir,
+            script_names=scripts,
+            script_paths=script_paths,
+        ))
+    return tuple(bundles)
+
+
+def _parse_flat(yaml_block: str) -> dict | None:
+    """Parse a flat ``key: scalar`` mapping, or return None if it isn't one.
+
+    Covers the common SKILL.md shape without PyYAML; anything it isn't sure
+    about (nesting, block scalars, flow collections, ambiguous plain
+    scalars) returns None so the caller can fall back to ``yaml.safe_load``.
+    """
+    result: dict = {}
+    for line in yaml_block.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        m = _FLAT_LINE.match(line)
+        if m is None:
+            return None
+        key, value = m.group(1), m.group(2) or ""
+        if key in result:
+            return None
+        if value in _NULLS:
+            result[key] = None
+        elif value in _BOOLS:
+            result[key] = _BOOLS[value]
+        elif _INT.match(value):
+            result[key] = int(value)
+        elif len(value) >= 2 and value[0] == value[-1] == "'" and "'" not in value[1:-1]:
+            result[key] = value[1:-1]
+        elif (
+            len(value) >= 2 and value[0] == value[-1] == '"'
+            and '"' not in value[1:-1] and "\\" not in value
+        ):
+            result[key] = value[1:-1]
+        elif _YAML_SPECIAL.search(value):
+            return None
+        else:
+            result[key] = value
+    return result
+
+
+def _parse_text(text: str) -> dict:
     stripped = text.lstrip()
     if not stripped.startswith("---"):
         return {}
@@ -29,4 +180,210 @@ def parse_frontmatter(text: str) -> dict:
     if end == -1:
         return {}
     yaml_block = stripped[3:end]
+    fm = _parse_flat(yaml_block)
+    if fm is not None:
+        return fm
+    # Nested or otherwise non-trivial frontmatter — use the real thing
+    import yaml
+
     return yaml.safe_load(yaml_block) or {}
+
+
+def parse_frontmatter(text: str) -> dict:
+    """Extract YAML frontmatter delimited by ``---`` from a Markdown file.
+
+    Parses are cached by content digest and each call returns a fresh
+    (shallow) copy.
+    """
+    if not _FM_OPEN.match(text):
+        return {}
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    fm = _TEXT_CACHE.get(key)
+    if fm is None:
+        fm = _TEXT_CACHE[key] = _parse_text(text)
+    return dict(fm)
+
+
+_SCRIPT_EXTS = ("py", "sh", "sql")
+
+
+def _find_script_refs(content: str) -> set[str]:
+    r"""Return the file names of explicit ``scripts/<name>.<py|sh|sql>`` refs.
+
+    Equivalent to ``re.findall(r"scripts/([\w-]+\.(?:py|sh|sql))", content)``
+    but done with ``str.find`` and a character scan; documents that never
+    mention ``scripts/`` are rejected without scanning at all.
+    """
+    refs: set[str] = set()
+    if "scripts/" not in content:
+        return refs
+    size = len(content)
+    pos = content.find("scripts/")
+    while pos != -1:
+        start = end = pos + 8  # len("scripts/")
+        while end < size and (content[end].isalnum() or content[end] in "_-"):
+            end += 1
+        nxt = pos + 1
+        if end > start and content.startswith(".", end):
+            for ext in _SCRIPT_EXTS:
+                if content.startswith(ext, end + 1):
+                    nxt = end + 1 + len(ext)
+                    refs.add(content[start:nxt])
+                    break
+        pos = content.find("scripts/", nxt)
+    return refs
+
+
+# ---------------------------------------------------------------------------
+# Stub DB objects  (stand-ins for psycopg2 connection / RealDictCursor)
+# ---------------------------------------------------------------------------
+
+
+def render_sql(query) -> str:
+    """Render a ``psycopg2.sql`` composable as a string, without a connection.
+
+    ``as_string()`` needs a live connection to quote with, so the stub
+    renders the pieces itself: identifiers double-quoted the way PostgreSQL
+    would, placeholders as ``%s``.  Plain strings pass through unchanged.
+    """
+    if isinstance(query, str):
+        return query
+    kind = type(query).__name__
+    if kind == "Composed":
+        return "".join(render_sql(q) for q in query.seq)
+    if kind == "SQL":
+        return str(query.string)
+    if kind == "Identifier":
+        return ".".join('"' + s.replace('"', '""') + '"' for s in query.strings)
+    if kind == "Placeholder":
+        return f"%({query.name})s" if query.name else "%s"
+    if kind == "Literal":
+        return repr(query.wrapped)
+    raise TypeError(f"cannot render {query!r}")
+
+
+class StubCursor:
+    """A stub cursor that behaves like psycopg2 RealDictCursor.
+
+    Holds a queue of result sets (``results``, a deque); each ``execute()``
+    pops the next one so sequential queries get different return values.  Executed
+    ``(sql, params)`` pairs are recorded in ``_calls`` only when
+    ``track_calls`` is set.
+    """
+
+    __slots__ = ("results", "_current", "description", "rowcount", "_calls", "track_calls")
+
+    def __init__(
+        self,
+        results: list[list[dict]] | None = None,
+        description=True,
+        *,
+        track_calls: bool = False,
+    ):
+        self.results: deque[list[dict]] = deque(results or ())
+        self._current: list[dict] = []
+        self.description = description  # None => write statement
+        self.rowcount = 0
+        self._calls: list[tuple] = []
+        self.track_calls = track_calls
+
+    def reset(self):
+        """Drop queued results, recorded calls and the current result set."""
+        self.results.clear()
+        self._calls.clear()
+        self._current = []
+        self.rowcount = 0
+
+    def add_result(self, rows: list[dict]):
+        """Queue a result set for the next execute() call."""
+        self.results.append(rows)
+        return self  # allow chaining
+
+    def execute(self, sql, params=None):
+        sql = render_sql(sql)
+        if self.track_calls:
+            self._calls.append((sql, params))
+        self._current = self.results.popleft() if self.results else []
+        self.rowcount = len(self._current)
+
+    def copy_expert(self, sql, file, size=8192):
+        """Emulate ``COPY ... FROM STDIN`` / ``COPY ... TO STDOUT``.
+
+        FROM: drain ``file`` like psycopg2 does; the data is recorded as
+        params.  TO: pop the next queued result set and write it to ``file``
+        as CSV with a header row (bytes unless ``file`` is a text stream).
+        """
+        sql = render_sql(sql)
+        if "TO STDOUT" in sql:
+            rows = self.results.popleft() if self.results else []
+            if self.track_calls:
+                self._calls.append((sql, None))
+            buf = io.StringIO()
+            if rows:
+                writer = csv.writer(buf, lineterminator="\n")
+                writer.writerow(rows[0].keys())
+                writer.writerows(r.values() for r in rows)
+            data = buf.getvalue()
+            file.write(data if isinstance(file, io.TextIOBase) else data.encode())
+            self.rowcount = len(rows)
+            return
+        chunks = []
+        while chunk := file.read(size):
+            chunks.append(chunk)
+        data = "".join(chunks)
+        if self.track_calls:
+            self._calls.append((sql, data))
+        self.rowcount = data.count("\n")
+
+    def fetchall(self):
+        return self._current
+
+    def fetchone(self):
+        return self._current[0] if self._current else None
+
+    def fetchmany(self, size=None):
+        return self._current[:size] if size else self._current
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        pass
+
+
+class StubConnection:
+    """A stub psycopg2 connection that hands out a single StubCursor."""
+
+    __slots__ = ("_cursor", "autocommit", "committed")
+
+    def __init__(self, cursor: StubCursor):
+        self._cursor = cursor
+        self.autocommit = False
+        self.committed = False
+
+    def reset(self):
+        """Return the connection (and its cursor) to a freshly made state."""
+        self.autocommit = False
+        self.committed = False
+        self._cursor.reset()
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a):
+        pass
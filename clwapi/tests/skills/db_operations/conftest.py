@@ -10,11 +10,15 @@ Every test file in this directory tests a single script from
 
 import sys
 import importlib.util
+from collections.abc import Sequence
 from pathlib import Path
+from types import ModuleType
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from tests.helpers import StubConnection, StubCursor
+
 SCRIPTS_DIR = (
     Path(__file__).resolve().parent.parent.parent.parent.parent
     / "sandbox"
@@ -27,85 +31,80 @@ SCRIPTS_DIR = (
 if str(SCRIPTS_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPTS_DIR))
 
+# Script modules, imported once per session and keyed by script name.
+# The scripts keep no module-level state, so main() can be re-run freely.
+_MODULE_CACHE: dict[str, ModuleType] = {}
 
-class FakeCursor:
-    """Cursor that yields pre-loaded results, one per execute() call."""
-
-    def __init__(self):
-        self.results: list[list[dict]] = []
-        self.description = True  # non-None => SELECT
-        self.rowcount = 0
-        self._calls: list[tuple] = []
-
-    def add_result(self, rows: list[dict]):
-        """Queue a result set for the next execute() call."""
-        self.results.append(rows)
-        return self  # allow chaining
-
-    def execute(self, sql, params=None):
-        self._calls.append((sql, params))
-        if self.results:
-            self._current = self.results.pop(0)
-        else:
-            self._current = []
-        self.rowcount = len(self._current)
-
-    def fetchall(self):
-        return self._current
-
-    def fetchone(self):
-        return self._current[0] if self._current else None
-
-    def fetchmany(self, size=None):
-        return self._current[:size] if size else self._current
-
-    def close(self):
-        pass
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *a):
-        pass
-
-
-class FakeConnection:
-    """Mock connection wrapping a FakeCursor."""
-
-    def __init__(self, cursor: FakeCursor):
-        self._cursor = cursor
-        self.autocommit = False
-        self.committed = False
-
-    def cursor(self, **kw):
-        return self._cursor
+# Per script: the (namespace, attribute) pairs through which it reaches
+# psycopg2.connect — all private to the script, so patching them never
+# touches the real psycopg2 module
+_CONNECT_TARGETS: dict[str, list[tuple[object, str]]] = {}
 
-    def commit(self):
-        self.committed = True
 
-    def rollback(self):
-        pass
+class _Psycopg2View(ModuleType):
+    """A script-private stand-in for ``psycopg2``.
 
-    def close(self):
-        pass
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *a):
-        pass
+    Attributes set on it (``connect``) shadow the real module; everything
+    else (``Error``, ``extras``, ...) is looked up on the real one.
+    """
 
-
-@pytest.fixture
-def db(monkeypatch):
-    """Provide a (FakeConnection, FakeCursor) pair.
+    def __init__(self, real: ModuleType):
+        super().__init__(real.__name__)
+        self._real = real
+
+    def __getattr__(self, name):
+        return getattr(self._real, name)
+
+
+def _connect_targets(mod: ModuleType) -> list[tuple[object, str]]:
+    """Rebind ``mod``'s psycopg2 references privately; return patch targets."""
+    targets: list[tuple[object, str]] = []
+    real = getattr(mod, "psycopg2", None)
+    if isinstance(real, ModuleType):
+        view = _Psycopg2View(real)
+        setattr(mod, "psycopg2", view)
+        targets.append((view, "connect"))
+        # ``from psycopg2 import connect`` binds the function directly
+        if getattr(mod, "connect", None) is real.connect:
+            targets.append((mod, "connect"))
+    # The scripts' shared factory (``from _pg import connect``)
+    connect = getattr(mod, "connect", None)
+    if getattr(connect, "__module__", None) == "_pg":
+        targets.append((mod, "connect"))
+    return targets
+
+
+def _load_script(script_name: str) -> ModuleType:
+    """Import ``scripts/<script_name>.py`` on first use, then reuse it."""
+    mod = _MODULE_CACHE.get(script_name)
+    if mod is not None:
+        return mod
+
+    script_path = SCRIPTS_DIR / f"{script_name}.py"
+    assert script_path.exists(), f"Script not found: {script_path}"
+
+    unique = f"_test_script_{script_name}"
+    spec = importlib.util.spec_from_file_location(unique, script_path)
+    assert spec is not None and spec.loader is not None
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[unique] = mod
+    spec.loader.exec_module(mod)
+    _CONNECT_TARGETS[script_name] = _connect_targets(mod)
+    _MODULE_CACHE[script_name] = mod
+    return mod
+
+
+@pytest.fixture(scope="session")
+def db():
+    """Provide a (StubConnection, StubCursor) pair, shared by the session.
 
     ``psycopg2.connect`` is monkey-patched at the *module level* of the
     script under test.  Tests should call ``cur.add_result(...)`` to queue
-    up return values before invoking the script's ``main()``.
+    up return values before invoking the script's ``main()``.  The pair is
+    reused across tests; ``run_script`` resets it before every run.
     """
-    cur = FakeCursor()
-    conn = FakeConnection(cur)
+    cur = StubCursor(track_calls=True)
+    conn = StubConnection(cur)
 
     def _fake_connect(**kw):
         return conn
@@ -115,7 +114,7 @@ def db(monkeypatch):
 
 
 @pytest.fixture
-def run_script(db, monkeypatch, capsys):
+def run_script(db, capsys):
     """High-level helper: import a script with DB mocked and return a runner.
 
     Usage::
@@ -127,53 +126,49 @@ def run_script(db, monkeypatch, capsys):
             ], argv=["list_tables.py", "public"])
 
             assert "users" in out
+
+    ``results`` may be any sequence of row sequences — tuples work, so
+    payloads shared across parametrised cases can be declared once at
+    module level.  Pass ``capture=False`` to skip reading stdout back
+    (``out`` is then ``""``) when a test only asserts on the cursor.
     """
     conn, cur, fake_connect = db
 
     def _run(
         script_name: str,
         *,
-        results: list[list[dict]] | None = None,
+        results: Sequence[Sequence[dict]] | None = None,
         argv: list[str] | None = None,
         description=True,
+        capture: bool = True,
     ):
-        # Queue results
-        cur.results.clear()
-        cur._calls.clear()
+        # Start from a clean connection, then queue results
+        conn.reset()
         cur.description = description
         if results:
-            for r in results:
-                cur.add_result(r)
+            # Copy each result set so shared (e.g. module-level tuple)
+            # payloads are never handed to the script by reference
+            cur.results.extend(list(r) for r in results)
 
-        # Patch sys.argv
-        if argv is not None:
-            monkeypatch.setattr(sys, "argv", argv)
+        mod = _load_script(script_name)
 
-        # Import the module fresh each time
-        script_path = SCRIPTS_DIR / f"{script_name}.py"
-        assert script_path.exists(), f"Script not found: {script_path}"
+        # Only the script's private bindings are patched, so nothing needs
+        # restoring — every run rebinds them to the current fake
+        for namespace, attr in _CONNECT_TARGETS[script_name]:
+            setattr(namespace, attr, fake_connect)
 
-        unique = f"_test_script_{script_name}"
-        spec = importlib.util.spec_from_file_location(unique, script_path)
-        mod = importlib.util.module_from_spec(spec)
-
-        # Patch psycopg2.connect before the module executes
-        import psycopg2 as _real_psycopg2
-
-        monkeypatch.setattr(_real_psycopg2, "connect", fake_connect)
-
-        # Also ensure the module-level import of psycopg2 uses our patch
-        mod.psycopg2 = _real_psycopg2
-        sys.modules[unique] = mod
-        spec.loader.exec_module(mod)
-
-        # Patch the module's own reference to psycopg2.connect
-        if hasattr(mod, "psycopg2"):
-            mod.psycopg2.connect = fake_connect
-
-        # Run main
-        mod.main()
-        captured = capsys.readouterr()
-        return conn, cur, captured.out
+        # Swap in sys.argv by hand and restore it straight after main(),
+        # even when it raises (e.g. SystemExit)
+        saved_argv = sys.argv
+        if argv is not None:
+            sys.argv = argv
+        try:
+            mod.main()
+        finally:
+            sys.argv = saved_argv
+
+        # Tests that only inspect the cursor pass capture=False
+        out = capsys.readouterr().out if capture else ""
+        return conn, cur, out
 
     return _run
@@ -5,51 +5,71 @@ import pytest
 pytestmark = pytest.mark.execution
 
 
-class TestDbIntrospect:
-    def test_full_report(self, run_script):
-        """Produces a report with schemas, tables, and columns."""
-        _, _, out = run_script("db_introspect", argv=["db_introspect.py"], results=[
-            # schemas
-            [{"schema_name": "public"}],
-            # tables in public
-            [{"table_name": "users"}],
-            # row count for users
-            [{"cnt": 200}],
-            # columns for users
-            [
+def test_full_report(run_script):
+    """Produces a report with schemas, tables, and columns."""
+    _, _, out = run_script("db_introspect", argv=["db_introspect.py"], results=[
+        # schemas
+        [{"schema_name": "public"}],
+        # every table with its columns
+        [{"table_schema": "public", "table_name": "users", "columns": [
+            {"column_name": "id", "data_type": "integer", "is_nullable": "NO"},
+            {"column_name": "email", "data_type": "text", "is_nullable": "YES"},
+        ]}],
+        # live-tuple estimates
+        [{"schemaname": "public", "relname": "users", "n_live_tup": 200}],
+    ])
+    assert "INTROSPECTION REPORT" in out
+    assert "public" in out
+    assert "users" in out
+    assert "~200 rows" in out
+    assert "id" in out
+    assert "email" in out
+
+
+def test_empty_schema(run_script):
+    """Schema with no tables shows '(no tables)' message."""
+    _, _, out = run_script("db_introspect", argv=["db_introspect.py"], results=[
+        [{"schema_name": "empty_schema"}],
+        [],  # no tables anywhere
+        [],  # no estimates
+    ])
+    assert "empty_schema" in out
+    assert "(no tables)" in out
+
+
+def test_multiple_schemas(run_script):
+    _, cur, out = run_script("db_introspect", argv=["db_introspect.py"], results=[
+        [{"schema_name": "analytics"}, {"schema_name": "public"}],
+        [
+            {"table_schema": "analytics", "table_name": "events", "columns": [
+                {"column_name": "event_id", "data_type": "bigint", "is_nullable": "NO"},
+            ]},
+            {"table_schema": "public", "table_name": "users", "columns": [
                 {"column_name": "id", "data_type": "integer", "is_nullable": "NO"},
-                {"column_name": "email", "data_type": "text", "is_nullable": "YES"},
-            ],
-        ])
-        assert "INTROSPECTION REPORT" in out
-        assert "public" in out
-        assert "users" in out
-        assert "200" in out
-        assert "id" in out
-        assert "email" in out
-
-    def test_empty_schema(self, run_script):
-        """Schema with no tables shows '(no tables)' message."""
-        _, _, out = run_script("db_introspect", argv=["db_introspect.py"], results=[
-            [{"schema_name": "empty_schema"}],
-            [],  # no tables
-        ])
-        assert "empty_schema" in out
-        assert "(no tables)" in out
-
-    def test_multiple_schemas(self, run_script):
-        _, _, out = run_script("db_introspect", argv=["db_introspect.py"], results=[
-            [{"schema_name": "public"}, {"schema_name": "analytics"}],
-            # public tables
-            [{"table_name": "users"}],
-            [{"cnt": 10}],
-            [{"column_name": "id", "data_type": "integer", "is_nullable": "NO"}],
-            # analytics tables
-            [{"table_name": "events"}],
-            [{"cnt": 500}],
-            [{"column_name": "event_id", "data_type": "bigint", "is_nullable": "NO"}],
-        ])
-        assert "public" in out
-        assert "analytics" in out
-        assert "users" in out
-        assert "events" in out
+            ]},
+        ],
+        [
+            {"schemaname": "analytics", "relname": "events", "n_live_tup": 500},
+            {"schemaname": "public", "relname": "users", "n_live_tup": 10},
+        ],
+    ])
+    assert "public" in out
+    assert "analytics" in out
+    assert "users" in out
+    assert "events" in out
+    assert "event_id" in out
+    assert "~500 rows" in out
+    assert "~10 rows" in out
+    # schemas + tables/columns + estimates — nothing per table
+    assert len(cur._calls) == 3
+
+
+def test_exact_counts(run_script):
+    """--exact runs a COUNT(*) per table instead of using estimates."""
+    _, cur, out = run_script("db_introspect", argv=["db_introspect.py", "--exact"], results=[
+        [{"schema_name": "public"}],
+        [{"table_schema": "public", "table_name": "users", "columns": []}],
+        [{"cnt": 7}],
+    ])
+    assert "(7 rows)" in out
+    assert 'COUNT(*) AS cnt FROM "public"."users"' in cur._calls[-1][0]
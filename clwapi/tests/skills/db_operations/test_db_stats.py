@@ -5,40 +5,45 @@ import pytest
 pytestmark = pytest.mark.execution
 
 
-class TestDbStats:
-    def test_stats_report(self, run_script):
-        """Prints database size, table sizes, and connection info."""
-        _, _, out = run_script("db_stats", argv=["db_stats.py"], results=[
-            # database size
-            [{"db_size": "25 MB"}],
-            # table sizes
-            [
-                {"table_name": "public.users", "total_size": "8192 bytes",
-                 "data_size": "8192 bytes", "estimated_rows": 150},
-            ],
-            # active connections
-            [],
-        ])
-        assert "DATABASE STATS" in out
-        assert "25 MB" in out
-        assert "public.users" in out
-        assert "150" in out
-
-    def test_with_connections(self, run_script):
-        _, _, out = run_script("db_stats", argv=["db_stats.py"], results=[
-            [{"db_size": "10 MB"}],
-            [],
-            [{"pid": 123, "usename": "postgres", "application_name": "psql",
-              "state": "idle", "query_start": "2026-01-01 00:00:00",
-              "query_preview": "SELECT 1"}],
-        ])
-        assert "Active connections: 1" in out
-        assert "PID 123" in out
-
-    def test_no_tables(self, run_script):
-        _, _, out = run_script("db_stats", argv=["db_stats.py"], results=[
-            [{"db_size": "7 MB"}],
-            [],
-            [],
-        ])
-        assert "7 MB" in out
+def _payload(db_size, tables=(), connections=()):
+    """The single json_build_object row db_stats.py fetches."""
+    return [[{"payload": {
+        "db_size": db_size,
+        "tables": list(tables),
+        "connections": list(connections),
+    }}]]
+
+
+def test_stats_report(run_script):
+    """Prints database size, table sizes, and connection info."""
+    _, cur, out = run_script("db_stats", argv=["db_stats.py"], results=_payload(
+        "25 MB",
+        tables=[
+            {"table_name": "public.users", "total_size": "8192 bytes",
+             "data_size": "8192 bytes", "estimated_rows": 150},
+        ],
+    ))
+    assert "DATABASE STATS" in out
+    assert "25 MB" in out
+    assert "public.users" in out
+    assert "150" in out
+    # Everything comes back in one round trip
+    assert len(cur._calls) == 1
+
+
+def test_with_connections(run_script):
+    _, _, out = run_script("db_stats", argv=["db_stats.py"], results=_payload(
+        "10 MB",
+        connections=[
+            {"pid": 123, "usename": "postgres", "application_name": "psql",
+             "state": "idle", "query_start": "2026-01-01 00:00:00",
+             "query_preview": "SELECT 1"},
+        ],
+    ))
+    assert "Active connections: 1" in out
+    assert "PID 123" in out
+
+
+def test_no_tables(run_script):
+    _, _, out = run_script("db_stats", argv=["db_stats.py"], results=_payload("7 MB"))
+    assert "7 MB" in out
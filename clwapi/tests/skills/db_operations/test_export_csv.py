@@ -1,48 +1,122 @@
 """Tests for skills/db-operations/scripts/export_csv.py"""
 
 import os
+from pathlib import Path
 
 import pytest
 
+from tests.helpers import StubCursor
+
 pytestmark = pytest.mark.execution
 
 
-class TestExportCsv:
-    def test_exports_table(self, run_script, tmp_path):
-        """Exports rows to a CSV file."""
-        out_file = str(tmp_path / "users.csv")
-        _, _, out = run_script("export_csv",
-            argv=["export_csv.py", "users", out_file],
-            results=[
-                [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}],
-            ])
-        assert "Exported 2 rows" in out
-        assert os.path.isfile(out_file)
-        content = open(out_file).read()
-        assert "id,name" in content
-        assert "Alice" in content
-        assert "Bob" in content
-
-    def test_exports_sql_query(self, run_script, tmp_path):
-        out_file = str(tmp_path / "result.csv")
-        _, _, out = run_script("export_csv",
-            argv=["export_csv.py", "--sql", "SELECT 1 AS val", out_file],
-            results=[
-                [{"val": 1}],
-            ])
-        assert "Exported 1 rows" in out
-
-    def test_empty_result(self, run_script, tmp_path):
-        out_file = str(tmp_path / "empty.csv")
-        _, _, out = run_script("export_csv",
-            argv=["export_csv.py", "empty_tbl", out_file],
-            results=[
-                [],
-            ])
-        assert "No data" in out
-        assert not os.path.isfile(out_file)
-
-    def test_no_args_exits(self, run_script):
-        with pytest.raises(SystemExit) as exc_info:
-            run_script("export_csv", argv=["export_csv.py"], results=[])
-        assert exc_info.value.code == 1
+def test_exports_table(run_script, tmp_path):
+    """Exports rows to a CSV file."""
+    out_file = str(tmp_path / "users.csv")
+    _, _, out = run_script("export_csv",
+        argv=["export_csv.py", "users", out_file],
+        results=[
+            [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}],
+        ])
+    assert "Exported 2 rows" in out
+    assert os.path.isfile(out_file)
+    content = Path(out_file).read_bytes()
+    assert b"id,name" in content
+    assert b"Alice" in content
+    assert b"Bob" in content
+
+
+def test_exports_sql_query(run_script, tmp_path):
+    out_file = str(tmp_path / "result.csv")
+    _, _, out = run_script("export_csv",
+        argv=["export_csv.py", "--sql", "SELECT 1 AS val", out_file],
+        results=[
+            [{"val": 1}],
+        ])
+    assert "Exported 1 rows" in out
+
+
+def test_empty_result(run_script, tmp_path):
+    out_file = str(tmp_path / "empty.csv")
+    _, _, out = run_script("export_csv",
+        argv=["export_csv.py", "empty_tbl", out_file],
+        results=[
+            [],
+        ])
+    assert "No data" in out
+    assert not os.path.isfile(out_file)
+
+
+def test_failed_query_keeps_existing_file(run_script, tmp_path, monkeypatch):
+    """A COPY that fails leaves a previous export untouched and no temp file."""
+    out_file = tmp_path / "users.csv"
+    out_file.write_bytes(b"id\n1\n")
+
+    def _fail(self, sql, file, size=8192):
+        file.write(b"partial")
+        raise RuntimeError("syntax error")
+
+    monkeypatch.setattr(StubCursor, "copy_expert", _fail)
+    with pytest.raises(RuntimeError):
+        run_script("export_csv", argv=["export_csv.py", "users", str(out_file)])
+    assert out_file.read_bytes() == b"id\n1\n"
+    assert os.listdir(tmp_path) == ["users.csv"]
+
+
+def test_streams_query_through_copy(run_script, tmp_path):
+    """The query is wrapped in COPY ... TO STDOUT, minus any trailing ';'."""
+    out_file = str(tmp_path / "result.csv")
+    _, cur, _ = run_script("export_csv",
+        argv=["export_csv.py", "--sql", "SELECT 1 AS val; ", out_file],
+        results=[
+            [{"val": 1}],
+        ])
+    assert cur._calls == [
+        ("COPY (SELECT 1 AS val\n) TO STDOUT WITH (FORMAT csv, HEADER true)", None),
+    ]
+    assert Path(out_file).read_bytes() == b"val\n1\n"
+
+
+def test_trailing_line_comment(run_script, tmp_path):
+    """A --sql query ending in a -- comment doesn't comment out the wrapper."""
+    out_file = str(tmp_path / "result.csv")
+    _, cur, out = run_script("export_csv",
+        argv=["export_csv.py", "--sql", "SELECT 1 AS val -- just one", out_file],
+        results=[
+            [{"val": 1}],
+        ])
+    sql = cur._calls[0][0]
+    assert sql.startswith("COPY (SELECT 1 AS val -- just one\n) TO STDOUT")
+    assert "Exported 1 rows" in out
+
+
+def test_binary_format(run_script, tmp_path):
+    """--format binary switches the COPY to PostgreSQL's binary format."""
+    out_file = str(tmp_path / "users.pgbin")
+    _, cur, out = run_script("export_csv",
+        argv=["export_csv.py", "users", out_file, "--format", "binary"],
+        results=[
+            [{"id": 1}],
+        ])
+    assert cur._calls[0][0] == (
+        'COPY (SELECT * FROM "public"."users"\n) TO STDOUT WITH (FORMAT binary)'
+    )
+    assert "Exported 1 rows" in out
+
+
+def test_quotes_table_identifier(run_script, tmp_path):
+    """Table and schema names are quoted as identifiers, embedded quotes doubled."""
+    out_file = str(tmp_path / "odd.csv")
+    _, cur, _ = run_script("export_csv",
+        argv=["export_csv.py", 'we"ird', out_file, "my schema"],
+        results=[
+            [{"id": 1}],
+        ])
+    assert cur._calls[0][0].startswith(
+        'COPY (SELECT * FROM "my schema"."we""ird"\n) TO STDOUT'
+    )
+
+
+def test_unknown_format(run_script):
+    with pytest.raises(SystemExit):
+        run_script("export_csv", argv=["export_csv.py", "users", "--format=xml"])
@@ -0,0 +1,20 @@
+"""Usage errors shared by the db-operations scripts that require arguments."""
+
+import pytest
+
+pytestmark = pytest.mark.execution
+
+
+@pytest.mark.parametrize("script_name", [
+    "describe_table",
+    "export_csv",
+    "import_csv",
+    "preview_table",
+    "run_query",
+    "search_data",
+])
+def test_no_args_exits(run_script, script_name):
+    """Calling without the required arguments should exit with code 1."""
+    with pytest.raises(SystemExit) as exc_info:
+        run_script(script_name, argv=[f"{script_name}.py"], results=())
+    assert exc_info.value.code == 1
@@ -0,0 +1,58 @@
+"""Tests for skills/db-operations/scripts/_pg.py"""
+
+import pytest
+
+import _pg
+
+pytestmark = pytest.mark.execution
+
+
+@pytest.fixture
+def connect_kwargs(monkeypatch):
+    """Capture the keyword arguments _pg.connect hands to psycopg2."""
+    for var, _ in _pg._ENV_PARAMS:
+        monkeypatch.delenv(var, raising=False)
+    for var in _pg._LIBPQ_HOST_VARS:
+        monkeypatch.delenv(var, raising=False)
+    seen = {}
+    monkeypatch.setattr(_pg.psycopg2, "connect", lambda **kw: seen.update(kw))
+    return seen
+
+
+def test_defaults_from_env(connect_kwargs, monkeypatch):
+    monkeypatch.setenv("POSTGRES_HOST", "db.internal")
+    monkeypatch.setenv("POSTGRES_PORT", "6432")
+    _pg.connect()
+    assert connect_kwargs["host"] == "db.internal"
+    assert connect_kwargs["port"] == 6432
+    assert connect_kwargs["keepalives"] == 1
+    assert connect_kwargs["options"] == "-c jit=off"
+
+
+def test_only_set_variables_passed(connect_kwargs):
+    """Unset POSTGRES_* values are left to libpq's own defaults."""
+    _pg.connect()
+    assert connect_kwargs["host"] == "clwdb"
+    for kw in ("port", "dbname", "user", "password"):
+        assert kw not in connect_kwargs
+
+
+@pytest.mark.parametrize("var", ["PGHOST", "PGSERVICE"])
+def test_libpq_host_variables_win(connect_kwargs, monkeypatch, var):
+    """PGHOST / PGSERVICE aren't overridden by the clwdb default."""
+    monkeypatch.setenv(var, "/var/run/postgresql")
+    monkeypatch.setenv("POSTGRES_USER", "agent")
+    _pg.connect()
+    assert "host" not in connect_kwargs
+    assert connect_kwargs["user"] == "agent"
+
+
+def test_jit_left_on(connect_kwargs):
+    _pg.connect(jit=True)
+    assert "options" not in connect_kwargs
+
+
+def test_extra_overrides(connect_kwargs):
+    _pg.connect(connect_timeout=5, keepalives=0)
+    assert connect_kwargs["connect_timeout"] == 5
+    assert connect_kwargs["keepalives"] == 0
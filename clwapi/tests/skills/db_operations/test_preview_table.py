@@ -5,43 +5,63 @@ import pytest
 pytestmark = pytest.mark.execution
 
 
-class TestPreviewTable:
-    def test_preview_rows(self, run_script):
-        """Shows a formatted preview of table rows."""
-        _, _, out = run_script("preview_table", argv=["preview_table.py", "users"], results=[
-            # COUNT(*)
-            [{"cnt": 50}],
-            # SELECT * LIMIT 10
-            [
-                {"id": 1, "name": "Alice"},
-                {"id": 2, "name": "Bob"},
-            ],
-        ])
-        assert "Alice" in out
-        assert "Bob" in out
-        assert "showing 2 of 50" in out
-        assert "48 more row(s)" in out
-
-    def test_empty_table(self, run_script):
-        _, _, out = run_script("preview_table", argv=["preview_table.py", "empty_tbl"], results=[
-            [{"cnt": 0}],
-            [],
+def test_preview_rows(run_script):
+    """Shows a formatted preview of table rows."""
+    _, _, out = run_script("preview_table", argv=["preview_table.py", "users"], results=[
+        # pg_class.reltuples estimate
+        [{"cnt": 50}],
+        # SELECT * LIMIT 10
+        [
+            {"id": 1, "name": "Alice"},
+            {"id": 2, "name": "Bob"},
+        ],
+    ])
+    assert "Alice" in out
+    assert "Bob" in out
+    assert "showing 2 of ~50" in out
+    assert "~48 more row(s)" in out
+
+
+def test_exact_count_when_never_analysed(run_script):
+    """reltuples = -1 (never analysed) falls back to an exact COUNT(*)."""
+    _, cur, out = run_script("preview_table", argv=["preview_table.py", "users"], results=[
+        [{"cnt": -1}],
+        # COUNT(*)
+        [{"cnt": 3}],
+        [{"id": 1, "name": "Alice"}],
+    ])
+    assert "COUNT(*)" in cur._calls[1][0]
+    assert "showing 1 of 3" in out
+    assert "2 more row(s)" in out
+    assert "~" not in out
+
+
+def test_stale_estimate_never_below_fetched_rows(run_script):
+    _, _, out = run_script("preview_table", argv=["preview_table.py", "users"], results=[
+        [{"cnt": 0}],
+        [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}],
+    ])
+    assert "showing 2 of ~2" in out
+    assert "more row(s)" not in out
+
+
+def test_empty_table(run_script):
+    _, _, out = run_script("preview_table", argv=["preview_table.py", "empty_tbl"], results=[
+        [{"cnt": 0}],
+        [],
+    ])
+    assert "empty" in out.lower()
+
+
+def test_custom_limit(run_script):
+    """A custom limit argument is passed to the query."""
+    _, cur, _ = run_script("preview_table",
+        argv=["preview_table.py", "users", "5"],
+        capture=False,
+        results=[
+            [{"cnt": 100}],
+            [{"id": i, "name": f"user{i}"} for i in range(5)],
         ])
-        assert "empty" in out.lower()
-
-    def test_custom_limit(self, run_script):
-        """A custom limit argument is passed to the query."""
-        _, cur, out = run_script("preview_table",
-            argv=["preview_table.py", "users", "5"],
-            results=[
-                [{"cnt": 100}],
-                [{"id": i, "name": f"user{i}"} for i in range(5)],
-            ])
-        # The LIMIT query should use 5
-        sql, params = cur._calls[1]
-        assert params == (5,)
-
-    def test_no_args_exits(self, run_script):
-        with pytest.raises(SystemExit) as exc_info:
-            run_script("preview_table", argv=["preview_table.py"], results=[])
-        assert exc_info.value.code == 1
+    # The LIMIT query should use 5
+    sql, params = cur._calls[1]
+    assert params == (5,)
@@ -5,35 +5,152 @@ import pytest
 pytestmark = pytest.mark.execution
 
 
-class TestSearchData:
-    def test_finds_matches(self, run_script):
-        """Matching rows are printed with the matched column values."""
-        _, _, out = run_script("search_data", argv=["search_data.py", "alice"], results=[
-            # text columns query
+def test_finds_matches(run_script):
+    """Matching rows are printed with the matched column values."""
+    _, _, out = run_script("search_data", argv=["search_data.py", "alice"], results=[
+        # text columns query
+        [
+            {"table_name": "users", "column_name": "email"},
+            {"table_name": "users", "column_name": "name"},
+        ],
+        # batched search: rows tagged with their table, as json
+        [{"__t": "users", "__r": {"id": 1, "email": "alice@example.com", "name": "Alice"}}],
+    ])
+    assert "alice@example.com" in out
+    assert "users" in out
+
+
+def test_tables_searched_in_batches(run_script):
+    """Tables are searched SEARCH_BATCH at a time, one execute per batch."""
+    _, cur, out = run_script("search_data", argv=["search_data.py", "bob", "--jobs", "1"], results=[
+        [{"table_name": f"t{i:02d}", "column_name": "name"} for i in range(40)],
+        [{"__t": "t03", "__r": {"name": "Bob"}}],
+        [{"__t": "t35", "__r": {"name": "bobby"}}],
+    ])
+    assert len(cur._calls) == 3
+    sql, params = cur._calls[1]
+    assert sql.count("UNION ALL") == 31
+    assert params[:2] == ["t00", "%bob%"]
+    assert "public.t03" in out and "public.t35" in out
+    assert out.index("public.t03") < out.index("public.t35")
+
+
+def test_unreadable_tables_left_out(run_script):
+    """Only tables the role can SELECT from are listed, so none sinks a batch."""
+    _, cur, out = run_script("search_data", argv=["search_data.py", "bob", "--jobs", "1"], results=[
+        # what the catalog query returns when "secret" isn't readable
+        [
+            {"table_name": "customers", "column_name": "name"},
+            {"table_name": "users", "column_name": "name"},
+        ],
+        [{"__t": "users", "__r": {"name": "Bob"}}],
+    ])
+    columns_sql = cur._calls[0][0]
+    assert "has_table_privilege(c.oid, 'SELECT')" in columns_sql
+    assert "COALESCE(NULLIF(t.typbasetype, 0), t.oid)" in columns_sql
+    _, params = cur._calls[1]
+    assert [p for p in params if not p.startswith("%")] == ["customers", "users"]
+    assert "public.users" in out
+
+
+def test_no_matches(run_script):
+    _, _, out = run_script("search_data", argv=["search_data.py", "zzz_nonexistent"], results=[
+        [{"table_name": "users", "column_name": "email"}],
+        [],  # no matches
+    ])
+    assert "No matches found" in out
+
+
+def test_no_text_columns(run_script):
+    _, _, out = run_script("search_data", argv=["search_data.py", "test"], results=[
+        [],  # no text columns in schema
+    ])
+    assert "No text columns" in out
+
+
+def test_batches_run_in_parallel(run_script):
+    """Several batches with --jobs > 1 are all searched, results merged."""
+    _, cur, out = run_script("search_data", argv=["search_data.py", "zzz", "--jobs=3"], results=[
+        [{"table_name": f"t{i:03d}", "column_name": "name"} for i in range(100)],
+        [], [], [], [],  # four batches, no matches
+    ])
+    assert len(cur._calls) == 5
+    assert sorted(params[0] for _, params in cur._calls[1:]) == ["t000", "t032", "t064", "t096"]
+    assert "No matches found" in out
+
+
+def test_create_indexes(run_script):
+    """--create-indexes adds one trigram expression index per real table."""
+    conn, cur, out = run_script(
+        "search_data",
+        argv=["search_data.py", "alice", "--create-indexes"],
+        results=[
+            [
+                {"table_name": "user_view", "column_name": "email", "indexable": False},
+                {"table_name": "users", "column_name": "email", "indexable": True},
+                {"table_name": "users", "column_name": "name", "indexable": True},
+            ],
+            [],  # CREATE EXTENSION
+            [],  # CREATE INDEX on users
+            [{"__t": "users", "__r": {"email": "alice@example.com", "name": "Alice"}}],
+        ],
+    )
+    statements = [sql for sql, _ in cur._calls]
+    assert len(statements) == 4
+    assert statements[1] == "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+    haystack = """(coalesce("email", '') || E'\\x1f' || coalesce("name", ''))"""
+    assert statements[2].startswith('CREATE INDEX IF NOT EXISTS "ix_trgm_users_')
+    assert statements[2].endswith(f'ON "public"."users" USING gin ({haystack} gin_trgm_ops)')
+    # The search uses the very same expression, with a single bind per table
+    search_sql, params = cur._calls[3]
+    assert f"{haystack} ILIKE %s" in search_sql
+    assert params == ["user_view", "%alice%", "users", "%alice%"]
+    assert conn.committed
+    assert "Trigram indexes in place: 1" in out
+    assert "email: alice@example.com" in out
+
+
+def test_index_names_fit_and_stay_distinct(run_script):
+    """Index names stay within PostgreSQL's 63 bytes and never collide."""
+    long_name = "t" * 70
+    _, cur, _ = run_script(
+        "search_data",
+        argv=["search_data.py", "x*", "--create-indexes"],
+        results=[
             [
-                {"table_name": "users", "column_name": "email"},
-                {"table_name": "users", "column_name": "name"},
+                {"table_name": "a_b", "column_name": "c", "indexable": True},
+                {"table_name": "a", "column_name": "b_c", "indexable": True},
+                {"table_name": long_name, "column_name": "name", "indexable": True},
             ],
-            # search results for users
-            [{"id": 1, "email": "alice@example.com", "name": "Alice"}],
-        ])
-        assert "alice@example.com" in out
-        assert "users" in out
-
-    def test_no_matches(self, run_script):
-        _, _, out = run_script("search_data", argv=["search_data.py", "zzz_nonexistent"], results=[
-            [{"table_name": "users", "column_name": "email"}],
-            [],  # no matches
-        ])
-        assert "No matches found" in out
-
-    def test_no_text_columns(self, run_script):
-        _, _, out = run_script("search_data", argv=["search_data.py", "test"], results=[
-            [],  # no text columns in schema
-        ])
-        assert "No text columns" in out
-
-    def test_no_args_exits(self, run_script):
-        with pytest.raises(SystemExit) as exc_info:
-            run_script("search_data", argv=["search_data.py"], results=[])
-        assert exc_info.value.code == 1
+        ],
+    )
+    names = [sql.split('"')[1] for sql, _ in cur._calls if sql.startswith("CREATE INDEX")]
+    assert len(names) == 3
+    assert len(set(names)) == 3
+    assert all(len(n.encode()) <= 63 for n in names)
+
+
+def test_prefix_search(run_script):
+    """A trailing '*' switches to an anchored lower(col) LIKE 'term%' search."""
+    _, cur, out = run_script("search_data", argv=["search_data.py", "Ali*"], results=[
+        [{"table_name": "users", "column_name": "name"}],
+        [{"__t": "users", "__r": {"name": "Alice"}}],
+    ])
+    sql, params = cur._calls[1]
+    assert 'lower("name") LIKE lower(%s)' in sql
+    assert "ILIKE" not in sql
+    assert params == ["users", "Ali%"]
+    assert "name: Alice" in out
+
+
+def test_null_cells_never_shown(run_script):
+    """NULL columns aren't reported as matches (not even for 'none')."""
+    _, _, out = run_script("search_data", argv=["search_data.py", "non"], results=[
+        [
+            {"table_name": "users", "column_name": "name"},
+            {"table_name": "users", "column_name": "nickname"},
+        ],
+        [{"__t": "users", "__r": {"name": "Nonna", "nickname": None}}],
+    ])
+    assert "name: Nonna" in out
+    assert "nickname" not in out
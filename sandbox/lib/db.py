@@ -5,41 +5,142 @@ Provides three entry points:
   - execute_query(sql, params)  — SELECT → list[dict]  (max 500 rows)
   - execute_write(sql, params)  — INSERT/UPDATE/DELETE/DDL → int (affected rows)
   - get_connection()            — context manager → raw psycopg2 connection
+
+Connections come from a process-wide pool, so a script that issues several
+statements pays the TCP + auth handshake once.  At most POSTGRES_POOL_MAX
+(default 4) are checked out at a time; further callers, e.g. extra threads,
+wait until one is handed back.
 """
 
 import os
+import re
 import json
+import uuid
+import atexit
+import threading
 from contextlib import contextmanager
 from datetime import date, datetime
 from decimal import Decimal
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 
 MAX_ROWS = 500
 
+# Statements that can safely run as ``DECLARE … CURSOR FOR <sql>``: plain
+# queries, and none of the words that make one write, lock rows or create a
+# table (data-modifying CTEs, ``FOR UPDATE``/``FOR SHARE``, ``SELECT INTO``).
+# A false "unsafe" only costs the client-side path, so the check is crude.
+_CURSOR_QUERY = re.compile(r"\s*\(*\s*(?:SELECT|VALUES|TABLE|WITH)\b", re.IGNORECASE)
+_CURSOR_UNSAFE = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE|INTO|SHARE)\b", re.IGNORECASE)
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# One slot per pooled connection: ThreadedConnectionPool.getconn() raises
+# PoolError when all are checked out, so callers wait here for one instead
+_POOL_SLOTS = None
+
+
+def _get_pool():
+    """Return the connection pool, creating it on first use."""
+    global _POOL, _POOL_SLOTS
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                maxconn = int(os.environ.get("POSTGRES_POOL_MAX", "4"))
+                _POOL_SLOTS = threading.BoundedSemaphore(maxconn)
+                _POOL = ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=maxconn,
+                    host=os.environ.get("POSTGRES_HOST", "clwdb"),
+                    port=int(os.environ.get("POSTGRES_PORT", "5432")),
+                    database=os.environ.get("POSTGRES_DB", "postgres"),
+                    user=os.environ.get("POSTGRES_USER", "postgres"),
+                    password=os.environ.get("POSTGRES_PASSWORD", ""),
+                )
+                atexit.register(_POOL.closeall)
+    return _POOL
+
+
+def _acquire():
+    """Check a connection out of the pool, waiting while all are in use."""
+    pool = _get_pool()
+    _POOL_SLOTS.acquire()
+    try:
+        return pool.getconn()
+    except BaseException:
+        _POOL_SLOTS.release()
+        raise
+
+
+def _release(conn):
+    """Reset a connection's session and hand it back to the pool.
+
+    The next caller must not inherit this one's session: ``reset()`` aborts
+    any open transaction, and ``DISCARD ALL`` drops ``SET`` values (e.g.
+    ``search_path``), temp tables, prepared statements and advisory locks.
+    A connection that is closed, or fails the reset, is discarded instead.
+    """
+    close = bool(conn.closed)
+    if not close:
+        try:
+            conn.reset()
+            conn.autocommit = True  # DISCARD ALL can't run in a transaction
+            with conn.cursor() as cur:
+                cur.execute("DISCARD ALL")
+            conn.autocommit = False  # don't leak the caller's setting
+        except psycopg2.Error:
+            close = True
+    try:
+        _get_pool().putconn(conn, close=close)
+    finally:
+        _POOL_SLOTS.release()
+
 
-def _connect():
-    """Create a new psycopg2 connection using environment variables."""
-    return psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
+def _fits_cursor(sql):
+    """True if ``sql`` is a plain query a server-side cursor can wrap."""
+    return (
+        isinstance(sql, str)
+        and _CURSOR_QUERY.match(sql) is not None
+        and _CURSOR_UNSAFE.search(sql) is None
     )
 
 
+def _decode_memoryview(m):
+    return m.tobytes().decode("utf-8", errors="replace")
+
+
+# JSON-unsafe base types and their converters; datetime must precede date
+_CONVERTIBLE = (
+    (datetime, datetime.isoformat),
+    (date, date.isoformat),
+    (Decimal, float),
+    (memoryview, _decode_memoryview),
+)
+
+# Exact type → converter (None = already JSON-safe).  Filled lazily, so each
+# value costs one dict lookup instead of an isinstance ladder.
+_CONVERTERS = {t: conv for t, conv in _CONVERTIBLE}
+
+
+def _converter(t):
+    """Return the converter for values of type ``t`` (None if not needed)."""
+    try:
+        return _CONVERTERS[t]
+    except KeyError:
+        conv = next((c for base, c in _CONVERTIBLE if issubclass(t, base)), None)
+        _CONVERTERS[t] = conv
+        return conv
+
+
 class _Encoder(json.JSONEncoder):
     """Handle date/datetime/Decimal/memoryview when converting rows."""
 
     def default(self, o):
-        if isinstance(o, (date, datetime)):
-            return o.isoformat()
-        if isinstance(o, Decimal):
-            return float(o)
-        if isinstance(o, memoryview):
-            return o.tobytes().decode("utf-8", errors="replace")
+        conv = _converter(type(o))
+        if conv is not None:
+            return conv(o)
         return super().default(o)
 
 
@@ -47,14 +148,8 @@ def _normalise_row(row):
     """Convert a RealDictRow to a plain dict with JSON-safe values."""
     out = {}
     for k, v in row.items():
-        if isinstance(v, (date, datetime)):
-            out[k] = v.isoformat()
-        elif isinstance(v, Decimal):
-            out[k] = float(v)
-        elif isinstance(v, memoryview):
-            out[k] = v.tobytes().decode("utf-8", errors="replace")
-        else:
-            out[k] = v
+        conv = _converter(type(v))
+        out[k] = v if conv is None else conv(v)
     return out
 
 
@@ -64,6 +159,11 @@ def _normalise_row(row):
 def execute_query(sql, params=None):
     """Run a SELECT and return up to MAX_ROWS rows as a list of dicts.
 
+    Plain queries run through a server-side (named) cursor, so Postgres
+    sends at most MAX_ROWS rows no matter how many the query would produce.
+    Anything else (``SHOW``, ``INSERT … RETURNING``, data-modifying CTEs,
+    ``FOR UPDATE``, …) runs on a regular cursor, as ``DECLARE`` would reject it.
+
     Args:
         sql:    SQL string (should be a SELECT or other row-returning query).
         params: Optional tuple/list/dict of bind parameters for %s / %(name)s.
@@ -74,15 +174,25 @@ def execute_query(sql, params=None):
     Raises:
         psycopg2.Error on any database-level failure.
     """
-    conn = _connect()
+    conn = _acquire()
     try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchmany(MAX_ROWS)
+        if _fits_cursor(sql):
+            with conn.cursor(
+                name=f"q_{uuid.uuid4().hex}",
+                cursor_factory=RealDictCursor,
+                withhold=False,
+            ) as cur:
+                cur.itersize = MAX_ROWS
+                cur.execute(sql, params)
+                rows = cur.fetchmany(MAX_ROWS)
+        else:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchmany(MAX_ROWS)
         conn.rollback()  # read-only — release any held locks
         return [_normalise_row(r) for r in rows]
     finally:
-        conn.close()
+        _release(conn)
 
 
 def execute_write(sql, params=None):
@@ -99,7 +209,7 @@ def execute_write(sql, params=None):
     Raises:
         psycopg2.Error on any database-level failure (transaction is rolled back).
     """
-    conn = _connect()
+    conn = _acquire()
     try:
         with conn.cursor() as cur:
             cur.execute(sql, params)
@@ -107,10 +217,11 @@ def execute_write(sql, params=None):
         conn.commit()
         return affected
     except Exception:
-        conn.rollback()
+        if not conn.closed:
+            conn.rollback()
         raise
     finally:
-        conn.close()
+        _release(conn)
 
 
 @contextmanager
@@ -121,7 +232,8 @@ def get_connection():
     advanced features (COPY, LISTEN/NOTIFY, server-side cursors, etc.).
 
     The connection is **not** auto-committed — call ``conn.commit()``
-    explicitly.  The connection is closed when the block exits.
+    explicitly.  When the block exits, uncommitted work is rolled back,
+    session state is discarded and the connection is returned to the pool.
 
     Example::
 
@@ -132,8 +244,8 @@ def get_connection():
                 cur.execute("INSERT INTO t (x) VALUES (%s)", (2,))
                 conn.commit()
     """
-    conn = _connect()
+    conn = _acquire()
     try:
         yield conn
     finally:
-        conn.close()
+        _release(conn)
@@ -0,0 +1,51 @@
+"""
+Shared psycopg2 connection factory for the db-operations scripts.
+
+Not a script itself — the others do ``from _pg import connect`` (the
+scripts/ directory is on ``sys.path`` when they're run as
+``python3 scripts/<name>.py``).
+"""
+
+import os
+import psycopg2
+
+# POSTGRES_* variable -> psycopg2.connect keyword
+_ENV_PARAMS = (
+    ("POSTGRES_HOST", "host"),
+    ("POSTGRES_PORT", "port"),
+    ("POSTGRES_DB", "dbname"),
+    ("POSTGRES_USER", "user"),
+    ("POSTGRES_PASSWORD", "password"),
+)
+
+# libpq variables that choose the server; with none of them set (and no
+# POSTGRES_HOST) the sandbox's database container is the default
+_LIBPQ_HOST_VARS = ("PGHOST", "PGHOSTADDR", "PGSERVICE")
+
+
+def connect(*, jit=False, **extra):
+    """Open a connection from the ``POSTGRES_*`` environment variables.
+
+    Only the ``POSTGRES_*`` variables that are set are passed on; anything
+    else is left to libpq, so ``PGSERVICE`` (a service file), ``PGHOST``
+    (e.g. a UNIX socket directory or a PgBouncer) and the other ``PG*``
+    variables take effect.  The host falls back to ``clwdb`` only when
+    neither ``POSTGRES_HOST`` nor a libpq host variable is present.
+
+    TCP keepalives are on so an idle connection behind a NAT or proxy isn't
+    silently dropped mid-script.  JIT compilation is switched off unless
+    ``jit`` is true: the catalog lookups and small queries these scripts run
+    finish long before JIT would pay for its compile time.  ``extra`` is
+    passed through to ``psycopg2.connect`` and overrides any default.
+    """
+    params = {kw: os.environ[var] for var, kw in _ENV_PARAMS if var in os.environ}
+    if "port" in params:
+        params["port"] = int(params["port"])
+    if "host" not in params and not any(v in os.environ for v in _LIBPQ_HOST_VARS):
+        params["host"] = "clwdb"
+    params["keepalives"] = 1
+    params["keepalives_idle"] = 30
+    if not jit:
+        params["options"] = "-c jit=off"
+    params.update(extra)
+    return psycopg2.connect(**params)
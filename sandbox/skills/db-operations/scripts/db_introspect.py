@@ -5,13 +5,17 @@ Introspect the workspace database and print a summary.
 Self-contained — no dependencies beyond psycopg2 (pre-installed in sandbox).
 
 Run from sandbox:
-    python3 scripts/db_introspect.py
+    python3 scripts/db_introspect.py [--exact]
+
+Row counts are the statistics collector's live-tuple estimates (``~N``);
+pass ``--exact`` to run a COUNT(*) per table instead.
 """
 
-import os
-import psycopg2
+import sys
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
+from _pg import connect
 
 
 # ---------------------------------------------------------------------------
@@ -21,24 +25,41 @@ from contextlib import contextmanager
 
 @contextmanager
 def _connect():
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    conn = connect()
     try:
         yield conn
     finally:
         conn.close()
 
 
-def query(sql, params=None):
-    with _connect() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, params)
-            return [dict(r) for r in cur.fetchall()]
+def query(cur, statement, params=None):
+    cur.execute(statement, params)
+    return [dict(r) for r in cur.fetchall()]
+
+
+# Every base table outside the system schemas with its columns, in one
+# query; psycopg2 decodes the json column list into plain dicts
+TABLES_SQL = """
+    SELECT
+        t.table_schema,
+        t.table_name,
+        COALESCE(
+            json_agg(json_build_object(
+                'column_name', c.column_name,
+                'data_type', c.data_type,
+                'is_nullable', c.is_nullable
+            ) ORDER BY c.ordinal_position) FILTER (WHERE c.column_name IS NOT NULL),
+            '[]'::json
+        ) AS columns
+    FROM information_schema.tables t
+    LEFT JOIN information_schema.columns c
+      ON c.table_schema = t.table_schema AND c.table_name = t.table_name
+    WHERE t.table_type = 'BASE TABLE'
+      AND t.table_schema NOT LIKE 'pg_%%'
+      AND t.table_schema != 'information_schema'
+    GROUP BY t.table_schema, t.table_name
+    ORDER BY t.table_schema, t.table_name
+"""
 
 
 # ---------------------------------------------------------------------------
@@ -47,7 +68,16 @@ def query(sql, params=None):
 
 
 def main():
+    exact = "--exact" in sys.argv[1:]
+    # One connection for the whole report
+    with _connect() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            report(cur, exact=exact)
+
+
+def report(cur, exact=False):
     schemas = query(
+        cur,
         """
         SELECT schema_name
         FROM information_schema.schemata
@@ -57,52 +87,56 @@ def main():
         """
     )
 
-    print("=" * 60)
-    print("DATABASE INTROSPECTION REPORT")
-    print("=" * 60)
+    tables_by_schema: dict[str, list[dict]] = {}
+    for tbl in query(cur, TABLES_SQL):
+        tables_by_schema.setdefault(tbl["table_schema"], []).append(tbl)
+
+    # Catalog estimates for every table at once, instead of a scan each
+    estimates = {}
+    if not exact:
+        estimates = {
+            (r["schemaname"], r["relname"]): r["n_live_tup"]
+            for r in query(
+                cur, "SELECT schemaname, relname, n_live_tup FROM pg_stat_user_tables"
+            )
+        }
+
+    # Collect the whole report and emit it with a single write
+    out = ["=" * 60, "DATABASE INTROSPECTION REPORT", "=" * 60]
 
     for schema in schemas:
         schema_name = schema["schema_name"]
-        print(f"\n--- Schema: {schema_name} ---")
-
-        tables = query(
-            """
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = %s AND table_type = 'BASE TABLE'
-            ORDER BY table_name
-            """,
-            (schema_name,),
-        )
+        out.append(f"\n--- Schema: {schema_name} ---")
 
+        tables = tables_by_schema.get(schema_name)
         if not tables:
-            print("  (no tables)")
+            out.append("  (no tables)")
             continue
 
         for tbl in tables:
             table_name = tbl["table_name"]
 
-            rows = query(f'SELECT COUNT(*) AS cnt FROM "{schema_name}"."{table_name}"')
-            row_count = rows[0]["cnt"] if rows else "?"
-
-            columns = query(
-                """
-                SELECT column_name, data_type, is_nullable
-                FROM information_schema.columns
-                WHERE table_schema = %s AND table_name = %s
-                ORDER BY ordinal_position
-                """,
-                (schema_name, table_name),
-            )
-
-            print(f"\n  Table: {table_name}  ({row_count} rows)")
-            for col in columns:
-                nullable = "NULL" if col["is_nullable"] == "YES" else "NOT NULL"
-                print(
-                    f"    - {col['column_name']:30s} {col['data_type']:20s} {nullable}"
+            if exact:
+                rows = query(
+                    cur,
+                    sql.SQL("SELECT COUNT(*) AS cnt FROM {}").format(
+                        sql.Identifier(schema_name, table_name)
+                    ),
                 )
+                row_count = rows[0]["cnt"] if rows else "?"
+            else:
+                est = estimates.get((schema_name, table_name))
+                row_count = f"~{est}" if est is not None else "?"
+
+            out.append(f"\n  Table: {table_name}  ({row_count} rows)")
+            out.extend(
+                f"    - {col['column_name']:30s} {col['data_type']:20s} "
+                f"{'NULL' if col['is_nullable'] == 'YES' else 'NOT NULL'}"
+                for col in tbl["columns"]
+            )
 
-    print("\n" + "=" * 60)
+    out.append("\n" + "=" * 60)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
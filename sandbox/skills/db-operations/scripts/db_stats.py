@@ -6,50 +6,59 @@ Usage:
     python3 scripts/db_stats.py
 """
 
-import os
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from _pg import connect
 
-
-def main():
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Database size
-            cur.execute("SELECT pg_size_pretty(pg_database_size(current_database())) AS db_size")
-            db_size = cur.fetchone()["db_size"]
-
-            # Table sizes
-            cur.execute("""
+# Size, top tables and active connections in one round trip; psycopg2
+# decodes the json payload into plain dicts/lists
+STATS_SQL = """
+    SELECT json_build_object(
+        'db_size', pg_size_pretty(pg_database_size(current_database())),
+        'tables', COALESCE((
+            SELECT json_agg(json_build_object(
+                       'table_name', table_name,
+                       'total_size', pg_size_pretty(total_bytes),
+                       'data_size', data_size,
+                       'estimated_rows', estimated_rows
+                   ) ORDER BY total_bytes DESC)
+            FROM (
                 SELECT
                     schemaname || '.' || relname AS table_name,
-                    pg_size_pretty(pg_total_relation_size(relid)) AS total_size,
+                    pg_total_relation_size(relid) AS total_bytes,
                     pg_size_pretty(pg_relation_size(relid)) AS data_size,
                     n_live_tup AS estimated_rows
                 FROM pg_stat_user_tables
                 ORDER BY pg_total_relation_size(relid) DESC
                 LIMIT 20
-            """)
-            tables = cur.fetchall()
+            ) t
+        ), '[]'::json),
+        'connections', COALESCE((
+            SELECT json_agg(json_build_object(
+                       'pid', pid,
+                       'usename', usename,
+                       'application_name', application_name,
+                       'state', state,
+                       'query_start', query_start::text,
+                       'query_preview', LEFT(query, 80)
+                   ) ORDER BY query_start DESC NULLS LAST)
+            FROM pg_stat_activity
+            WHERE datname = current_database()
+              AND pid != pg_backend_pid()
+        ), '[]'::json)
+    ) AS payload
+"""
 
-            # Active connections
-            cur.execute("""
-                SELECT
-                    pid, usename, application_name, state,
-                    query_start::text,
-                    LEFT(query, 80) AS query_preview
-                FROM pg_stat_activity
-                WHERE datname = current_database()
-                  AND pid != pg_backend_pid()
-                ORDER BY query_start DESC NULLS LAST
-            """)
-            connections = cur.fetchall()
+
+def main():
+    conn = connect()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(STATS_SQL)
+            payload = cur.fetchone()["payload"]
+
+        db_size = payload["db_size"]
+        tables = payload["tables"]
+        connections = payload["connections"]
 
         print("=" * 60)
         print("DATABASE STATS")
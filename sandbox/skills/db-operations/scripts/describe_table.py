@@ -9,10 +9,10 @@ Usage:
     schema  — defaults to 'public'
 """
 
-import os
 import sys
-import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
+from _pg import connect
 
 
 def main():
@@ -23,13 +23,7 @@ def main():
     table = sys.argv[1]
     schema = sys.argv[2] if len(sys.argv) > 2 else "public"
 
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    conn = connect()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             # Columns
@@ -47,7 +41,9 @@ def main():
                 return
 
             # Row count
-            cur.execute(f'SELECT COUNT(*) AS cnt FROM "{schema}"."{table}"')
+            cur.execute(
+                sql.SQL("SELECT COUNT(*) AS cnt FROM {}").format(sql.Identifier(schema, table))
+            )
             row_count = cur.fetchone()["cnt"]
 
             # Indexes
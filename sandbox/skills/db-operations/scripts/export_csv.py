@@ -3,62 +3,99 @@
 Export a table (or query result) to CSV.
 
 Usage:
-    python3 scripts/export_csv.py <table> [output_file] [schema]
-    python3 scripts/export_csv.py --sql "SELECT ..." [output_file]
+    python3 scripts/export_csv.py <table> [output_file] [schema] [--format binary]
+    python3 scripts/export_csv.py --sql "SELECT ..." [output_file] [--format binary]
 
     table       — table name
     output_file — path to write CSV (default: /workspace/<table>.csv)
     schema      — default 'public'
+
+The CSV is produced by the server with ``COPY (...) TO STDOUT`` and streamed
+straight into the output file — rows never become Python objects.
+
+``--format binary`` writes PostgreSQL's binary COPY format instead (default
+file: /workspace/<table>.pgbin): values keep their native wire encoding,
+so numbers and timestamps are never converted to text.  Reload it into a
+table with the same column types by feeding the file to
+``COPY <table> FROM STDIN WITH (FORMAT binary)`` (``cur.copy_expert``).
 """
 
 import os
 import sys
-import csv
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import uuid
+from psycopg2 import sql
+from _pg import connect
+
+# --format value -> (COPY options, default file extension)
+FORMATS = {
+    "csv": ("FORMAT csv, HEADER true", "csv"),
+    "binary": ("FORMAT binary", "pgbin"),
+}
+
+
+def _pop_format(argv):
+    """Remove ``--format X`` / ``--format=X`` from argv; return (argv, X)."""
+    rest, fmt = [], "csv"
+    it = iter(argv)
+    for a in it:
+        if a == "--format":
+            fmt = next(it, fmt)
+        elif a.startswith("--format="):
+            fmt = a.split("=", 1)[1]
+        else:
+            rest.append(a)
+    return rest, fmt.lower()
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: export_csv.py <table> [output_file] [schema]")
-        print("       export_csv.py --sql \"SELECT ...\" [output_file]")
+    argv, fmt = _pop_format(sys.argv)
+    if len(argv) < 2 or fmt not in FORMATS:
+        print("Usage: export_csv.py <table> [output_file] [schema] [--format csv|binary]")
+        print("       export_csv.py --sql \"SELECT ...\" [output_file] [--format csv|binary]")
         sys.exit(1)
+    options, ext = FORMATS[fmt]
 
     # Parse args
-    if sys.argv[1] == "--sql":
-        sql = sys.argv[2]
-        output = sys.argv[3] if len(sys.argv) > 3 else "/workspace/export.csv"
+    if argv[1] == "--sql":
+        # COPY wraps the query in parentheses, where a trailing ';' is invalid
+        query = sql.SQL(argv[2].strip().rstrip(";"))
+        output = argv[3] if len(argv) > 3 else f"/workspace/export.{ext}"
         table_label = "query"
     else:
-        table = sys.argv[1]
-        schema = sys.argv[3] if len(sys.argv) > 3 else "public"
-        output = sys.argv[2] if len(sys.argv) > 2 else f"/workspace/{table}.csv"
-        sql = f'SELECT * FROM "{schema}"."{table}"'
+        table = argv[1]
+        schema = argv[3] if len(argv) > 3 else "public"
+        output = argv[2] if len(argv) > 2 else f"/workspace/{table}.{ext}"
+        query = sql.SQL("SELECT * FROM {}").format(sql.Identifier(schema, table))
         table_label = f"{schema}.{table}"
 
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    conn = connect(jit=True)
     try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql)
-            rows = cur.fetchall()
+        # SELECT * rather than COPY "schema"."table" so views export too
+        # The newline ends any trailing ``--`` comment in a --sql query
+        # before it can swallow the closing parenthesis
+        copy_sql = sql.SQL("COPY ({}\n) TO STDOUT WITH ({})").format(query, sql.SQL(options))
+        # COPY into a sibling temp file and rename it over ``output`` only
+        # once it succeeded, so a failing query never truncates or deletes
+        # a file that was already there
+        head, name = os.path.split(output)
+        tmp = os.path.join(head, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            # psycopg2 calls write() once per row; a 1 MiB buffer turns
+            # that into a few large write syscalls
+            with open(tmp, "xb", buffering=1 << 20) as f, conn.cursor() as cur:
+                cur.copy_expert(copy_sql, f)
+                count = cur.rowcount  # psycopg2 sets it from the COPY tag
+            if count:
+                os.replace(tmp, output)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
 
-        if not rows:
+        if count == 0:
             print(f"No data returned from {table_label}.")
             return
 
-        cols = list(rows[0].keys())
-        with open(output, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=cols)
-            writer.writeheader()
-            writer.writerows(rows)
-
-        print(f"Exported {len(rows)} rows to {output}")
+        print(f"Exported {count} rows to {output}")
     finally:
         conn.close()
 
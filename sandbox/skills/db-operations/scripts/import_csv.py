@@ -12,13 +12,55 @@ Usage:
 If the table already exists, rows are appended. Column names must match.
 If the table doesn't exist, it's created with all TEXT columns — you can
 ALTER types afterwards.
+
+Rows are streamed into Postgres with a single ``COPY ... FROM STDIN``
+rather than one INSERT per row, so the file is never held in memory.
 """
 
 import os
 import sys
 import csv
-import psycopg2
+import itertools
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
+from _pg import connect
+
+
+def _copy_field(value):
+    """Format one value for COPY CSV: None → NULL, anything else quoted."""
+    if value is None:
+        return ""
+    return '"' + value.replace('"', '""') + '"'
+
+
+class _CopyStream:
+    """File-like ``read()`` over CSV rows, re-encoded for ``COPY FROM STDIN``.
+
+    Rows are normalised the way ``csv.DictReader`` would see them: blank
+    lines are skipped, short rows are padded with NULLs and extra trailing
+    fields are dropped.  ``count`` is the number of rows streamed so far.
+    """
+
+    def __init__(self, rows, width):
+        self._rows = rows
+        self._width = width
+        self._buf = ""
+        self.count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            if not row:
+                continue  # blank line
+            row = (row + [None] * self._width)[: self._width]
+            self._buf += ",".join(map(_copy_field, row)) + "\n"
+            self.count += 1
+        if size < 0:
+            size = len(self._buf)
+        data, self._buf = self._buf[:size], self._buf[size:]
+        return data
 
 
 def main():
@@ -35,24 +77,22 @@ def main():
         sys.exit(1)
 
     with open(csv_path, newline="") as f:
-        reader = csv.DictReader(f)
-        columns = reader.fieldnames
+        reader = csv.reader(f)
+        columns = next(reader, None)
         if not columns:
             print("CSV has no header row.", file=sys.stderr)
             sys.exit(1)
-        rows = list(reader)
-
-    if not rows:
-        print("CSV has no data rows.")
-        return
-
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+        first = next((row for row in reader if row), None)
+        if first is None:
+            print("CSV has no data rows.")
+            return
+        stream = _CopyStream(itertools.chain([first], reader), len(columns))
+        _import(stream, columns, schema, table)
+
+
+def _import(stream, columns, schema, table):
+    """Create ``schema.table`` if needed and COPY ``stream`` into it."""
+    conn = connect()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             # Check if table exists
@@ -66,27 +106,32 @@ def main():
             exists = cur.fetchone()["count"] > 0
 
             if not exists:
-                col_defs = ", ".join(f'"{c}" TEXT' for c in columns)
-                cur.execute(f'CREATE TABLE "{schema}"."{table}" ({col_defs})')
+                col_defs = sql.SQL(", ").join(
+                    sql.SQL("{} TEXT").format(sql.Identifier(c)) for c in columns
+                )
+                cur.execute(
+                    sql.SQL("CREATE TABLE {} ({})").format(
+                        sql.Identifier(schema, table), col_defs
+                    )
+                )
                 print(
                     f"Created table {schema}.{table} with {len(columns)} TEXT columns."
                 )
 
-            # Insert rows
-            placeholders = ", ".join(["%s"] * len(columns))
-            col_names = ", ".join(f'"{c}"' for c in columns)
-            insert_sql = f'INSERT INTO "{schema}"."{table}" ({col_names}) VALUES ({placeholders})'
-
-            for row in rows:
-                values = [row.get(c) for c in columns]
-                cur.execute(insert_sql, values)
+            # Stream all rows in one COPY
+            cur.copy_expert(
+                sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                    sql.Identifier(schema, table),
+                    sql.SQL(", ").join(map(sql.Identifier, columns)),
+                ),
+                stream,
+            )
 
             conn.commit()
 
-        print(f"Imported {len(rows)} rows into {schema}.{table}")
+        print(f"Imported {stream.count} rows into {schema}.{table}")
     finally:
         conn.close()
 
-
 if __name__ == "__main__":
     main()
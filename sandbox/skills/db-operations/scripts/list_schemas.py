@@ -6,28 +6,23 @@ Usage:
     python3 scripts/list_schemas.py
 """
 
-import os
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from _pg import connect
 
 
 def main():
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    conn = connect()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # pg_namespace directly — information_schema.schemata wraps it
+            # in extra joins and per-row privilege checks
             cur.execute(
                 """
-                SELECT schema_name
-                FROM information_schema.schemata
-                WHERE schema_name NOT LIKE 'pg_%%'
-                  AND schema_name != 'information_schema'
-                ORDER BY schema_name
+                SELECT nspname AS schema_name
+                FROM pg_namespace
+                WHERE nspname NOT LIKE 'pg_%%'
+                  AND nspname != 'information_schema'
+                ORDER BY nspname
             """
             )
             schemas = cur.fetchall()
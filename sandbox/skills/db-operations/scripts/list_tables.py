@@ -3,49 +3,71 @@
 List all tables in a schema with row counts.
 
 Usage:
-    python3 scripts/list_tables.py [schema]
+    python3 scripts/list_tables.py [schema] [--exact]
 
     schema  — defaults to 'public'
+
+Row counts are the planner's estimates (``pg_class.reltuples``, shown as
+``~N``; ``?`` for tables never analysed), all read in one catalog query.
+Pass ``--exact`` for real counts, fetched with a single ``UNION ALL`` of
+COUNT(*)s.
 """
 
-import os
 import sys
-import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
+from _pg import connect
 
 
 def main():
-    schema = sys.argv[1] if len(sys.argv) > 1 else "public"
-
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    exact = "--exact" in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != "--exact"]
+    schema = args[0] if args else "public"
+
+    conn = connect()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # Tables (plain and partitioned) with their estimates in one go;
+            # reltuples is -1 until a table is first analysed
             cur.execute("""
-                SELECT table_name
-                FROM information_schema.tables
-                WHERE table_schema = %s AND table_type = 'BASE TABLE'
-                ORDER BY table_name
+                SELECT c.relname AS table_name, c.reltuples::bigint AS cnt
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+                ORDER BY c.relname
             """, (schema,))
-            tables = [r["table_name"] for r in cur.fetchall()]
+            tables = cur.fetchall()
 
             if not tables:
                 print(f"No tables found in schema '{schema}'.")
                 return
 
-            print(f"{'Table':40s} {'Rows':>10s}")
-            print("-" * 52)
-            for table in tables:
-                cur.execute(f'SELECT COUNT(*) AS cnt FROM "{schema}"."{table}"')
-                cnt = cur.fetchone()["cnt"]
-                print(f"{table:40s} {cnt:>10,d}")
+            if exact:
+                # Every count in one statement rather than one per table
+                cur.execute(
+                    sql.SQL(" UNION ALL ").join(
+                        sql.SQL("SELECT %s AS table_name, COUNT(*) AS cnt FROM {}").format(
+                            sql.Identifier(schema, t["table_name"])
+                        )
+                        for t in tables
+                    ),
+                    [t["table_name"] for t in tables],
+                )
+                counts = {r["table_name"]: f"{r['cnt']:,d}" for r in cur.fetchall()}
+            else:
+                counts = {
+                    t["table_name"]: f"~{t['cnt']:,d}" if t["cnt"] >= 0 else "?"
+                    for t in tables
+                }
 
-            print(f"\nTotal: {len(tables)} table(s) in '{schema}'")
+        # Header, rows and total go out in a single write
+        lines = [f"{'Table':40s} {'Rows':>10s}", "-" * 52]
+        lines.extend(
+            f"{t['table_name']:40s} {counts.get(t['table_name'], '?'):>10s}"
+            for t in tables
+        )
+        lines.append(f"\nTotal: {len(tables)} table(s) in '{schema}'")
+        sys.stdout.write("\n".join(lines) + "\n")
     finally:
         conn.close()
 
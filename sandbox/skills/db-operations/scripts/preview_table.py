@@ -8,15 +8,18 @@ Usage:
     table   — table name (required)
     limit   — number of rows, default 10
     schema  — default 'public'
+
+The total row count is the planner's estimate (``pg_class.reltuples``,
+shown as ``~N``); an exact COUNT(*) is only run for never-analysed tables.
 """
 
-import os
 import sys
 import json
-import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
 from datetime import date, datetime
 from decimal import Decimal
+from _pg import connect
 
 
 class _Encoder(json.JSONEncoder):
@@ -36,20 +39,31 @@ def main():
     table = sys.argv[1]
     limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
     schema = sys.argv[3] if len(sys.argv) > 3 else "public"
+    relation = sql.Identifier(schema, table)
 
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    conn = connect()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(f'SELECT COUNT(*) AS cnt FROM "{schema}"."{table}"')
-            total = cur.fetchone()["cnt"]
-
-            cur.execute(f'SELECT * FROM "{schema}"."{table}" LIMIT %s', (limit,))
+            # Catalog estimate instead of a full scan; reltuples is -1 until
+            # the table is first analysed, so only then count exactly
+            cur.execute(
+                """
+                SELECT c.reltuples::bigint AS cnt
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relname = %s
+            """,
+                (schema, table),
+            )
+            est = cur.fetchone()
+            estimated = est is not None and est["cnt"] >= 0
+            if estimated:
+                total = est["cnt"]
+            else:
+                cur.execute(sql.SQL("SELECT COUNT(*) AS cnt FROM {}").format(relation))
+                total = cur.fetchone()["cnt"]
+
+            cur.execute(sql.SQL("SELECT * FROM {} LIMIT %s").format(relation), (limit,))
             rows = [dict(r) for r in cur.fetchall()]
 
         if not rows:
@@ -57,31 +71,46 @@ def main():
             return
 
         cols = list(rows[0].keys())
-        widths = {c: len(c) for c in cols}
+        # Stringify and truncate each cell once, widening columns as we go
+        widths = [len(c) for c in cols]
         str_rows = []
+        # One encoder for every cell — json.dumps(cls=...) builds a new one
+        # per call; str is bound locally for the inner loop
+        encode, to_str = _Encoder().encode, str
         for row in rows:
-            sr = {}
-            for c in cols:
+            sr = []
+            for i, c in enumerate(cols):
                 val = row[c]
-                s = (
-                    json.dumps(val, cls=_Encoder)
-                    if isinstance(val, (dict, list))
-                    else str(val) if val is not None else "NULL"
-                )
-                sr[c] = s
-                widths[c] = max(widths[c], min(len(s), 50))
+                t = type(val)
+                if t is dict or t is list:
+                    s = encode(val)[:50]
+                elif val is None:
+                    s = "NULL"
+                else:
+                    s = to_str(val)[:50]
+                sr.append(s)
+                if len(s) > widths[i]:
+                    widths[i] = len(s)
             str_rows.append(sr)
 
-        print(f"\n  {schema}.{table}  (showing {len(rows)} of {total:,d})\n")
+        # A stale estimate can't be smaller than what we just fetched
+        total = max(total, len(rows))
+        approx = "~" if estimated else ""
+
+        print(f"\n  {schema}.{table}  (showing {len(rows)} of {approx}{total:,d})\n")
 
-        header = "  ".join(c.ljust(widths[c]) for c in cols)
-        print(header)
-        print("  ".join("-" * widths[c] for c in cols))
-        for sr in str_rows:
-            print("  ".join(sr[c][:50].ljust(widths[c]) for c in cols))
+        # Header, separator and rows go out in a single write
+        lines = [
+            "  ".join(c.ljust(w) for c, w in zip(cols, widths)),
+            "  ".join("-" * w for w in widths),
+        ]
+        lines.extend(
+            "  ".join(s.ljust(w) for s, w in zip(sr, widths)) for sr in str_rows
+        )
+        sys.stdout.write("\n".join(lines) + "\n")
 
         if total > len(rows):
-            print(f"\n  ... {total - len(rows):,d} more row(s)")
+            print(f"\n  ... {approx}{total - len(rows):,d} more row(s)")
         print()
     finally:
         conn.close()
@@ -7,13 +7,13 @@ Usage:
     python3 scripts/run_query.py "INSERT INTO public.logs (msg) VALUES ('test')"
 """
 
-import os
 import sys
 import json
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import date, datetime
 from decimal import Decimal
+from _pg import connect
 
 
 class _Encoder(json.JSONEncoder):
@@ -34,13 +34,7 @@ def main():
 
     sql = sys.argv[1]
 
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    conn = connect(jit=True)
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(sql)
@@ -54,25 +48,37 @@ def main():
                     return
 
                 cols = list(rows[0].keys())
-                # Calculate column widths
-                widths = {c: len(c) for c in cols}
+                # Stringify and truncate each cell once, widening columns as we go
+                widths = [len(c) for c in cols]
                 str_rows = []
+                # One encoder for every cell — json.dumps(cls=...) builds a
+                # new one per call; str is bound locally for the inner loop
+                encode, to_str = _Encoder().encode, str
                 for row in rows:
-                    sr = {}
-                    for c in cols:
+                    sr = []
+                    for i, c in enumerate(cols):
                         val = row[c]
-                        s = json.dumps(val, cls=_Encoder) if isinstance(val, (dict, list)) else str(val) if val is not None else "NULL"
-                        sr[c] = s
-                        widths[c] = max(widths[c], min(len(s), 60))
+                        t = type(val)
+                        if t is dict or t is list:
+                            s = encode(val)[:60]
+                        elif val is None:
+                            s = "NULL"
+                        else:
+                            s = to_str(val)[:60]
+                        sr.append(s)
+                        if len(s) > widths[i]:
+                            widths[i] = len(s)
                     str_rows.append(sr)
 
-                # Header
-                header = "  ".join(c.ljust(widths[c]) for c in cols)
-                print(header)
-                print("  ".join("-" * widths[c] for c in cols))
-
-                for sr in str_rows:
-                    print("  ".join(sr[c][:60].ljust(widths[c]) for c in cols))
+                # Header, separator and rows go out in a single write
+                lines = [
+                    "  ".join(c.ljust(w) for c, w in zip(cols, widths)),
+                    "  ".join("-" * w for w in widths),
+                ]
+                lines.extend(
+                    "  ".join(s.ljust(w) for s, w in zip(sr, widths)) for sr in str_rows
+                )
+                sys.stdout.write("\n".join(lines) + "\n")
 
                 print(f"\n({len(rows)} row{'s' if len(rows) != 1 else ''})")
             else:
@@ -3,45 +3,241 @@
 Search for a value across all text columns in all tables of a schema.
 
 Usage:
-    python3 scripts/search_data.py <search_term> [schema]
+    python3 scripts/search_data.py <search_term> [schema] [--prefix] [--create-indexes] [--jobs N]
 
     search_term — text to search for (case-insensitive ILIKE %%term%%)
     schema      — default 'public'
+
+``--prefix`` (or a search term ending in ``*``) matches values that start
+with the term instead, as ``lower(col) LIKE lower('term%%')``.
+
+Substring searches match all of a table's text columns at once, as one
+``ILIKE`` over their concatenation.
+
+``--create-indexes`` first ensures (``IF NOT EXISTS``) indexes matching the
+search on the schema's tables, so this and later searches don't scan each
+table: a ``pg_trgm`` GIN expression index on that concatenation per table
+for substring searches, a ``lower(col) text_pattern_ops`` btree per column
+for prefix ones.
+
+Tables are searched in batches of ``SEARCH_BATCH`` per statement; on large
+schemas up to ``--jobs`` batches (default 4) run concurrently, each on its
+own connection.
 """
 
-import os
+import queue
 import sys
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
+from _pg import connect
 
 
 TEXT_TYPES = {"text", "character varying", "character", "varchar", "char", "name"}
 
+# Tables searched per statement; keeps each UNION ALL a manageable size
+SEARCH_BATCH = 32
+
+# Default number of batches searched concurrently, each on its own connection
+DEFAULT_JOBS = 4
+
+
+def _haystack(cols):
+    """SQL for a row's text columns joined into one string (``\\x1f``-separated).
+
+    Matching one concatenation means a single predicate and a single
+    trigram expression index per table instead of an OR over each column.
+    """
+    parts = (sql.SQL("coalesce({}, '')").format(sql.Identifier(c)) for c in cols)
+    return sql.SQL("({})").format(sql.SQL(" || E'\\x1f' || ").join(parts))
+
+
+def _where(cols, prefix):
+    """Return ``(condition, bind_count)`` for searching ``cols``."""
+    if prefix:
+        # Anchored per column — a prefix of the concatenation would only
+        # ever test the first column
+        return sql.SQL(" OR ").join(
+            sql.SQL("lower({}) LIKE lower(%s)").format(sql.Identifier(c)) for c in cols
+        ), len(cols)
+    return sql.SQL("{} ILIKE %s").format(_haystack(cols)), 1
+
+
+def _index_name(kind, schema, table, cols):
+    """Index name for ``kind`` on ``schema.table (cols)``, within 63 bytes.
+
+    PostgreSQL truncates longer identifiers, which would drop the hash and
+    let different indexes share a name (``IF NOT EXISTS`` then skips the
+    second with only a NOTICE).  The table name is kept, shortened, for
+    readability; the hash of the full ``(schema, table, cols)`` keeps it
+    unique, and ties a trigram index to its exact column list so a changed
+    table gets a new index rather than silently keeping a stale one.
+    """
+    key = "\x1f".join((schema, table, *cols)).encode()
+    digest = hashlib.sha1(key).hexdigest()[:12]
+    label = table.encode()[:32].decode("utf-8", "ignore")
+    return f"ix_{kind}_{label}_{digest}"
+
+
+def _create_indexes(conn, schema, table_cols, indexable, prefix):
+    """Ensure indexes serving the search on every table that can have them.
+
+    Substring searches get one ``gin_trgm_ops`` expression index per table
+    on :func:`_haystack`, which serves its ``ILIKE '%term%'``; prefix
+    searches a ``lower(col) text_pattern_ops`` btree per column, which
+    serves ``lower(col) LIKE 'term%'``.  Failures (e.g. no privilege to
+    create the extension) are reported and the search goes ahead unindexed.
+    """
+    kind = "prefix" if prefix else "trigram"
+    targets = [(t, cols) for t, cols in table_cols.items() if t in indexable]
+    count = 0
+    try:
+        with conn.cursor() as cur:
+            if not prefix:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for table, cols in targets:
+                if prefix:
+                    for col in cols:
+                        cur.execute(
+                            sql.SQL(
+                                "CREATE INDEX IF NOT EXISTS {} ON {} (lower({}) text_pattern_ops)"
+                            ).format(
+                                sql.Identifier(_index_name("lowtxt", schema, table, [col])),
+                                sql.Identifier(schema, table),
+                                sql.Identifier(col),
+                            )
+                        )
+                        count += 1
+                else:
+                    cur.execute(
+                        sql.SQL(
+                            "CREATE INDEX IF NOT EXISTS {} ON {} USING gin ({} gin_trgm_ops)"
+                        ).format(
+                            sql.Identifier(_index_name("trgm", schema, table, cols)),
+                            sql.Identifier(schema, table),
+                            _haystack(cols),
+                        )
+                    )
+                    count += 1
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"Could not create {kind} indexes: {e.pgerror or e}", file=sys.stderr)
+        return
+    print(f"{kind.capitalize()} indexes in place: {count}.\n")
+
+
+def _search_batch(conn, schema, batch, pattern, prefix):
+    """Search one batch of ``(table, cols)`` in a single UNION ALL statement.
+
+    Each row comes back tagged with its table and as json (which psycopg2
+    decodes to a dict), so tables of any shape share one result set.
+    """
+    parts, params = [], []
+    for table, cols in batch:
+        conditions, binds = _where(cols, prefix)
+        parts.append(
+            sql.SQL(
+                "(SELECT %s AS __t, row_to_json(x) AS __r FROM "
+                "(SELECT * FROM {} WHERE {} LIMIT 5) x)"
+            ).format(sql.Identifier(schema, table), conditions)
+        )
+        params.append(table)
+        params.extend([pattern] * binds)
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(sql.SQL(" UNION ALL ").join(parts), params)
+        return cur.fetchall()
+
+
+def _search_parallel(conn, batches, jobs, search):
+    """Run ``search(conn, batch)`` for every batch on ``jobs`` connections.
+
+    ``conn`` plus ``jobs - 1`` extra connections form a small pool; each
+    worker borrows one for the duration of its batch.  Results come back
+    in batch order.
+    """
+    extra = []
+    try:
+        for _ in range(jobs - 1):
+            extra.append(connect())
+        pool = queue.Queue()
+        for c in [conn, *extra]:
+            pool.put(c)
+
+        def run(batch):
+            c = pool.get()
+            try:
+                return search(c, batch)
+            finally:
+                pool.put(c)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(run, batches))
+    finally:
+        for c in extra:
+            c.close()
+
+
+def _parse_args(argv):
+    """Split argv into ``(positional, flags, jobs)``."""
+    args, flags, jobs = [], set(), DEFAULT_JOBS
+    it = iter(argv)
+    for a in it:
+        if a in ("--prefix", "--create-indexes"):
+            flags.add(a)
+        elif a == "--jobs":
+            jobs = int(next(it, DEFAULT_JOBS))
+        elif a.startswith("--jobs="):
+            jobs = int(a.split("=", 1)[1])
+        else:
+            args.append(a)
+    return args, flags, max(1, jobs)
+
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: search_data.py <search_term> [schema]")
+    args, flags, jobs = _parse_args(sys.argv[1:])
+    create_indexes = "--create-indexes" in flags
+    prefix = "--prefix" in flags
+    if not args:
+        print(
+            "Usage: search_data.py <search_term> [schema] "
+            "[--prefix] [--create-indexes] [--jobs N]"
+        )
         sys.exit(1)
 
-    term = sys.argv[1]
-    schema = sys.argv[2] if len(sys.argv) > 2 else "public"
+    term = args[0]
+    schema = args[1] if len(args) > 1 else "public"
+    if term.endswith("*") and len(term) > 1:
+        prefix, term = True, term[:-1]
 
-    conn = psycopg2.connect(
-        host=os.environ.get("POSTGRES_HOST", "clwdb"),
-        port=int(os.environ.get("POSTGRES_PORT", "5432")),
-        database=os.environ.get("POSTGRES_DB", "postgres"),
-        user=os.environ.get("POSTGRES_USER", "postgres"),
-        password=os.environ.get("POSTGRES_PASSWORD", ""),
-    )
+    conn = connect()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Get all tables + text columns
+            # Get all tables + text columns, straight from pg_catalog rather
+            # than the much heavier information_schema.columns view; the
+            # relkinds are the ones that view lists (tables, views,
+            # materialized views, foreign and partitioned tables); only
+            # real relations can be indexed.  Like that view, skip what the
+            # role can't read — one unreadable table would fail its whole
+            # UNION ALL batch — and match domains by their base type.  The
+            # privilege is checked per table: the search runs SELECT *.
             cur.execute("""
-                SELECT table_name, column_name
-                FROM information_schema.columns
-                WHERE table_schema = %s
-                  AND data_type IN ('text', 'character varying', 'character', 'varchar', 'char', 'name')
-                ORDER BY table_name, ordinal_position
+                SELECT c.relname AS table_name, a.attname AS column_name,
+                       c.relkind IN ('r', 'm', 'p') AS indexable
+                FROM pg_attribute a
+                JOIN pg_class c ON c.oid = a.attrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_type t ON t.oid = a.atttypid
+                WHERE n.nspname = %s
+                  AND c.relkind IN ('r', 'v', 'm', 'f', 'p')
+                  AND a.attnum > 0
+                  AND NOT a.attisdropped
+                  AND COALESCE(NULLIF(t.typbasetype, 0), t.oid)
+                      = ANY ('{text,varchar,bpchar,name}'::regtype[])
+                  AND has_table_privilege(c.oid, 'SELECT')
+                ORDER BY c.relname, a.attnum
             """, (schema,))
             col_rows = cur.fetchall()
 
@@ -54,31 +250,51 @@ def main():
         for r in col_rows:
             table_cols.setdefault(r["table_name"], []).append(r["column_name"])
 
+        if create_indexes:
+            indexable = {r["table_name"] for r in col_rows if r["indexable"]}
+            _create_indexes(conn, schema, table_cols, indexable, prefix)
+
         print(f"Searching for '{term}' in {schema}...\n")
         found_any = False
+        pattern = f"{term}%" if prefix else f"%{term}%"
 
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            for table, cols in table_cols.items():
-                conditions = " OR ".join(
-                    f'"{c}" ILIKE %s' for c in cols
-                )
-                params = [f"%{term}%"] * len(cols)
-
-                cur.execute(
-                    f'SELECT * FROM "{schema}"."{table}" WHERE {conditions} LIMIT 5',
-                    params,
-                )
-                matches = cur.fetchall()
-                if matches:
-                    found_any = True
-                    print(f"  {schema}.{table}  ({len(matches)} match{'es' if len(matches) != 1 else ''} shown, max 5)")
-                    for row in matches:
-                        # Show only columns that matched
-                        for c in cols:
-                            val = str(row.get(c, ""))
-                            if term.lower() in val.lower():
-                                print(f"    {c}: {val[:120]}")
-                    print()
+        # Search up to SEARCH_BATCH tables per round trip, and with several
+        # batches run up to ``jobs`` of them at once on separate connections
+        tables = list(table_cols.items())
+        batches = [tables[i:i + SEARCH_BATCH] for i in range(0, len(tables), SEARCH_BATCH)]
+        jobs = min(jobs, len(batches))
+
+        def search(c, batch):
+            return _search_batch(c, schema, batch, pattern, prefix)
+
+        if jobs == 1:
+            results = [search(conn, batch) for batch in batches]
+        else:
+            results = _search_parallel(conn, batches, jobs, search)
+
+        matches_by_table = {}
+        for rows in results:
+            for r in rows:
+                matches_by_table.setdefault(r["__t"], []).append(r["__r"])
+
+        needle = term.lower()
+        for table, cols in tables:
+            matches = matches_by_table.get(table)
+            if matches:
+                found_any = True
+                print(f"  {schema}.{table}  ({len(matches)} match{'es' if len(matches) != 1 else ''} shown, max 5)")
+                for row in matches:
+                    # Show only columns that matched; NULLs never do
+                    for c in cols:
+                        val = row.get(c)
+                        if val is None:
+                            continue
+                        if type(val) is not str:
+                            val = str(val)
+                        low = val.lower()
+                        if low.startswith(needle) if prefix else needle in low:
+                            print(f"    {c}: {val[:120]}")
+                print()
 
         if not found_any:
             print("  No matches found.")